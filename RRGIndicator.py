@@ -1,18 +1,21 @@
-import pandas as pd
 import numpy as np
 import yfinance as yf
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-from scipy import interpolate
 from matplotlib.widgets import Slider, Button
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from app.data.snapshots import SnapshotCube
+from app.components.quadrant_colors import QUADRANT_ORDER, quadrant_color_array
+from app.components.rrg_table import classify_quadrants
+from app.components.smoothing import TailSmoother
 
 is_playing = False
 marker_size = []
 tail = 5
 start_date, end_date = None, None
+end_pos = None
 
 for i in range(tail):
     if i == tail-1:
@@ -20,32 +23,33 @@ for i in range(tail):
     else:
         marker_size.append(10)
 
-def get_line_points(x, y):
-    # Interpolate a smooth curve through the scatter points
-    tck, _ = interpolate.splprep([x, y], s=0)
-    t = np.linspace(0, 1, 100)
-    line_x, line_y = interpolate.splev(t, tck)
-    return line_x, line_y
+# Smoothed tails, memoized by (ticker, end date, tail length)
+smoother = TailSmoother(samples=12)
+
+def get_line_points(tail_coords, end_date):
+    # Interpolate smooth curves through every ticker's tail points in one batched call
+    points = np.swapaxes(tail_coords, 0, 1)
+    valid = np.isfinite(points).all(axis=2)
+    lengths = valid.sum(axis=1)
+    x, y = points[valid][:, 0], points[valid][:, 1]
+    group_end = np.zeros(len(x), dtype=bool)
+    group_end[np.cumsum(lengths)[lengths > 0] - 1] = True
+    keys = [(t, end_date, len(tail_coords)) for t, n in zip(tickers, lengths) if n > 0]
+    line_x, line_y, line_end = smoother.smooth(keys, x, y, group_end)
+    split = np.flatnonzero(line_end)[:-1] + 1
+    curves = iter(zip(np.split(line_x, split), np.split(line_y, split)))
+    return [next(curves) if n > 0 else ([], []) for n in lengths]
+
+# Status names and colors per quadrant code (see classify_quadrants)
+STATUS = np.array([q.lower() for q in QUADRANT_ORDER] + [None], dtype=object)
+STATUS_COLORS = {'Leading': 'green', 'Improving': 'blue', 'Weakening': 'yellow', 'Lagging': 'red'}
 
 def get_status(x, y):
-    if x < 100 and y < 100:
-        return 'lagging'
-    elif x > 100 and y > 100:
-        return 'leading'
-    elif x < 100 and y > 100:
-        return 'improving'
-    elif x > 100 and y < 100:
-        return 'weakening'
+    # Works on scalars or arrays of coordinates alike
+    return STATUS[classify_quadrants(x, y)]
     
 def get_color(x, y):
-    if get_status(x, y) == 'lagging':
-        return 'red'
-    elif get_status(x, y) == 'leading':
-        return 'green'
-    elif get_status(x, y) == 'improving':
-        return 'blue'
-    elif get_status(x, y) == 'weakening':
-        return 'yellow'
+    return quadrant_color_array(classify_quadrants(x, y), STATUS_COLORS, None)
     
 # Retrieve historical prices 
 period = '1y'
@@ -83,8 +87,11 @@ for i in range(len(tickers)):
     rsr_tickers[i] = rsr_tickers[i][rsr_tickers[i].index.isin(rsm_tickers[i].index)]
     rsm_tickers[i] = rsm_tickers[i][rsm_tickers[i].index.isin(rsr_tickers[i].index)]
 
+# All coordinates as one (date, ticker, 2) array, so each frame is a slice
+cube = SnapshotCube.from_series(rsr_tickers, rsm_tickers, tickers)
+
 def update_rrg():
-    global rs_tickers, rsr_tickers, rsr_roc_tickers, rsm_tickers
+    global rs_tickers, rsr_tickers, rsr_roc_tickers, rsm_tickers, cube
     rs_tickers = []
     rsr_tickers = []
     rsr_roc_tickers = []
@@ -97,6 +104,8 @@ def update_rrg():
         rsm_tickers.append((101 + ((rsr_roc_tickers[i] - rsr_roc_tickers[i].rolling(window=window).mean()) / rsr_roc_tickers[i].rolling(window=window).std(ddof=0))).dropna())
         rsr_tickers[i] = rsr_tickers[i][rsr_tickers[i].index.isin(rsm_tickers[i].index)]
         rsm_tickers[i] = rsm_tickers[i][rsm_tickers[i].index.isin(rsr_tickers[i].index)]
+    cube = SnapshotCube.from_series(rsr_tickers, rsm_tickers, tickers)
+    smoother.clear()
 
 root = tk.Tk()
 root.title('RRG Indicator')
@@ -305,26 +314,29 @@ for i in range(len(tickers)):
 
 # animation function. This is called sequentially 
 def animate(i):
-    global start_date, end_date
+    global start_date, end_date, end_pos
 
     if not is_playing:
         # take the value from the slider 
-        end_date = rsr_tickers[0].index[slider_end_date.val]
-        start_date = rsr_tickers[0].index[slider_end_date.val - tail]
+        end_pos = cube.position(rsr_tickers[0].index[slider_end_date.val])
     
-    # if the end date is reached, reset the start and end date
+    # step forward one bar
     else:
-        start_date += pd.to_timedelta(1,unit='w')
-        end_date += pd.to_timedelta(1,unit='w')
+        end_pos += 1
 
         # update the slider 
         slider_end_date.eventson = False
         #slider_end_date.set_val((slider_end_date.val + 1)%slider_end_date.valmax)
         slider_end_date.eventson = True
 
-    if end_date == rsr_tickers[0].index[-1]:
-        start_date = rsr_tickers[0].index[0]
-        end_date = start_date + pd.to_timedelta(tail,unit='w')
+    # if the end date is reached, restart from the first full tail
+    if end_pos >= len(cube) - 1:
+        end_pos = int(tail)
+    start_date = cube.dates[end_pos - int(tail)]
+    end_date = cube.dates[end_pos]
+    # (tail, tickers, 2) view of the bars in (start_date, end_date]
+    tail_coords = cube.tail(end_pos, int(tail))
+    line_points = get_line_points(tail_coords, end_date)
 
     for j in range(len(tickers)):
         # if ticker not to be displayed, skip it 
@@ -334,17 +346,16 @@ def animate(i):
             annotations[j] = ax[0].annotate('', (0, 0), fontsize=8)
 
         else:
-            filtered_rsr_tickers = rsr_tickers[j].loc[(rsr_tickers[j].index > start_date) & (rsr_tickers[j].index <= end_date)]
-            filtered_rsm_tickers = rsm_tickers[j].loc[(rsm_tickers[j].index > start_date) & (rsm_tickers[j].index <= end_date)]
+            points = tail_coords[:, j]
+            points = points[np.isfinite(points).all(axis=1)]
+            filtered_rsr_tickers, filtered_rsm_tickers = points[:, 0], points[:, 1]
             # Update the scatter
-            color = get_color(filtered_rsr_tickers.values[-1], filtered_rsm_tickers.values[-1])
-            scatter_plots[j] = ax[0].scatter(filtered_rsr_tickers.values, filtered_rsm_tickers.values, color=color, s=marker_size)
-            # Update the line
-            line_plots[j] = ax[0].plot(filtered_rsr_tickers.values, filtered_rsm_tickers.values, color='black', alpha=0.2)[0]
-            # Update the line with interpolation 
-            #line_plots[j].set_data(get_line_points(filtered_rsr_tickers.values, filtered_rsm_tickers.values))
+            color = get_color(filtered_rsr_tickers[-1], filtered_rsm_tickers[-1])
+            scatter_plots[j] = ax[0].scatter(filtered_rsr_tickers, filtered_rsm_tickers, color=color, s=marker_size[-len(points):])
+            # Update the line with interpolation
+            line_plots[j] = ax[0].plot(*line_points[j], color='black', alpha=0.2)[0]
             # Update the annotation
-            annotations[j] = ax[0].annotate(tickers[j], (filtered_rsr_tickers.values[-1], filtered_rsm_tickers.values[-1]))
+            annotations[j] = ax[0].annotate(tickers[j], (filtered_rsr_tickers[-1], filtered_rsm_tickers[-1]))
 
         # Update the price and change 
         price = round(tickers_data[tickers[j]][end_date], 2)
@@ -352,7 +363,7 @@ def animate(i):
         table.grid_slaves(row=j+1, column=2)[0].config(text=price)
         table.grid_slaves(row=j+1, column=3)[0].config(text=chg)
 
-        bg_color = get_color(rsr_tickers[j][end_date], rsm_tickers[j][end_date])
+        bg_color = get_color(*cube.at(end_pos)[j])
         fg_color = 'white' if bg_color in ['red', 'green', 'blue'] else 'black'
         for k in range(4):
             table.grid_slaves(row=j+1, column=k)[0].config(bg=bg_color, fg=fg_color)        
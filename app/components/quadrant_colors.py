@@ -1,3 +1,8 @@
+import numpy as np
+
+# Quadrant names in code order, as returned by rrg_table.classify_quadrants
+QUADRANT_ORDER = ["Leading", "Improving", "Weakening", "Lagging"]
+
 QUADRANT_COLORS = {
     "Leading": "rgba(76, 175, 80, 0.2)",  # Green, 20% opacity
     "Improving": "rgba(33, 150, 243, 0.2)",  # Blue, 20% opacity
@@ -25,3 +30,22 @@ QUADRANT_COLORS_TEXT = {
     "Weakening": "#000000",  # Black (for contrast)
     "Lagging": "#000000",  # Black (for contrast)
 }
+
+
+def quadrant_color_array(codes, colors, default="#888888") -> np.ndarray:
+    """
+    Vectorized lookup of a QUADRANT_COLORS* map for an array of quadrant codes.
+    Code -1 (missing coordinates) maps to `default`.
+    """
+    lut = np.array([colors[q] for q in QUADRANT_ORDER] + [default], dtype=object)
+    return lut[np.asarray(codes)]
+
+
+def quadrant_colorscale(colors, default="#888888") -> list:
+    """
+    Plotly colorscale mapping quadrant codes -1..3 (with cmin=-1, cmax=3) onto a
+    QUADRANT_COLORS* map, so per-point colors can be sent as numeric codes.
+    Code -1 (missing coordinates) maps to `default`, as in quadrant_color_array.
+    """
+    stops = [default] + [colors[q] for q in QUADRANT_ORDER]
+    return [[i / 4, color] for i, color in enumerate(stops)]
@@ -1,11 +1,25 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+from numpy.lib.stride_tricks import sliding_window_view
 
 from .quadrant_colors import (
     QUADRANT_COLORS_MID,
     QUADRANT_COLORS_TEXT,
+    quadrant_color_array,
+    quadrant_colorscale,
 )
-from .rrg_table import assign_quadrant
+from .rrg_table import classify_quadrants
+from .smoothing import TailSmoother, group_bounds, lttb_indices
+
+# Above this many tail points plot_rrg draws with WebGL (Scattergl)
+GL_POINT_THRESHOLD = 5000
+# WebGL figures keep at most this many tail points in total (LTTB per tail) and
+# about this many points in their smoothed lines
+GL_POINT_BUDGET = 10000
+GL_LINE_POINT_BUDGET = 20000
+# Smoothed tail curves, reused across reruns while a tail's latest bar is unchanged
+TAIL_SMOOTHER = TailSmoother()
 
 
 def plot_rrg(
@@ -14,6 +28,10 @@ def plot_rrg(
     max_points_per_ticker: int = None,
     period: str = "1y",
     fix_axes: bool = False,
+    gl_threshold: int = GL_POINT_THRESHOLD,
+    max_gl_tail_points: int = 500,
+    animate: bool = False,
+    max_frames: int = None,
 ):
     """
     Plot a Relative Rotation Graph (RRG) using Plotly.
@@ -23,11 +41,20 @@ def plot_rrg(
         max_points_per_ticker (int, optional): If set, only plot the last N points for each ticker.
         period (str, optional): Not used here, for compatibility.
         fix_axes (bool, optional): If True, fix axes to [96, 104].
+        gl_threshold (int, optional): Above this many tail points, draw tails with WebGL
+            (None keeps SVG). Tails are then downsampled with LTTB to at most
+            max_gl_tail_points each and GL_POINT_BUDGET in total, and
+            drawn as memoized Catmull-Rom curves (TAIL_SMOOTHER).
+        max_gl_tail_points (int, optional): Per-symbol point budget in WebGL mode.
+        animate (bool, optional): If True, df is the full history and the figure gets one
+            frame per bar (tails of max_points_per_ticker bars, 10 if unset) with a date
+            slider and Play/Pause buttons, all played in the browser. latest_points is
+            not used; each frame takes its own latest points. Implies SVG mode.
+        max_frames (int, optional): With animate, only the last max_frames bars.
     Returns:
         fig: Plotly Figure
     """
     fig = go.Figure()
-    symbols = df["Symbol"].unique()
 
     # Calculate axis ranges with 12.18% buffer, unless fix_axes is True
     if fix_axes:
@@ -41,76 +68,18 @@ def plot_rrg(
         x_range = [x_min - x_buffer, x_max + x_buffer]
         y_range = [y_min - y_buffer, y_max + y_buffer]
 
-    for symbol in symbols:
-        sub = df[df["Symbol"] == symbol].sort_values("Date")
-        if max_points_per_ticker is not None:
-            sub = sub.tail(max_points_per_ticker)
-        n = len(sub)
-        # Use latest_points for label/quadrant
-        latest_row = latest_points[latest_points["Symbol"] == symbol].iloc[0]
-        quadrant = assign_quadrant(latest_row["RS_Ratio"], latest_row["RS_Momentum"])
-        color = QUADRANT_COLORS_MID.get(quadrant, "#888888")
-        text_color = QUADRANT_COLORS_TEXT.get(quadrant, "#000000")
-        # Spline line for the trail
-        fig.add_trace(
-            go.Scatter(
-                x=sub["RS_Ratio"],
-                y=sub["RS_Momentum"],
-                mode="lines",
-                line=dict(color=color, width=4, shape="spline"),
-                showlegend=False,
-                hoverinfo="skip",
-            )
-        )
-        # Markers for all points, faded except the last two
-        marker_opacities = [0.2] * (n - 2) + [0.6, 1.0] if n >= 2 else [1.0]
-        fig.add_trace(
-            go.Scatter(
-                x=sub["RS_Ratio"],
-                y=sub["RS_Momentum"],
-                mode="markers",
-                marker=dict(size=6, color=color, opacity=marker_opacities),
-                showlegend=False,
-                hoverinfo="skip",
-            )
-        )
-        # Latest point: filled marker with label
-        fig.add_trace(
-            go.Scatter(
-                x=[latest_row["RS_Ratio"]],
-                y=[latest_row["RS_Momentum"]],
-                mode="markers+text",
-                marker=dict(
-                    size=14,
-                    color=color,
-                    symbol="circle",
-                    line=dict(width=2, color=text_color),
-                ),
-                text=[symbol],
-                textposition="top right",
-                name=symbol,
-                showlegend=False,
-                hoverinfo="skip",
-            )
-        )
-        # Optionally, previous point: open marker (directionality)
-        if n > 1:
-            prev_row = sub.iloc[-2]
-            fig.add_trace(
-                go.Scatter(
-                    x=[prev_row["RS_Ratio"]],
-                    y=[prev_row["RS_Momentum"]],
-                    mode="markers",
-                    marker=dict(
-                        size=12,
-                        color=color,
-                        symbol="circle-open",
-                        line=dict(width=2, color=color),
-                    ),
-                    showlegend=False,
-                    hoverinfo="skip",
-                )
-            )
+    if animate:
+        dates, frames = rrg_frames(df, max_points_per_ticker or 10, max_frames)
+        names, updatemenus, sliders = animation_controls(dates)
+        # The figure opens on the last frame
+        fig.add_traces(frames[-1])
+        fig.frames = [go.Frame(data=t, name=n) for t, n in zip(frames, names)]
+        fig.update_layout(updatemenus=updatemenus, sliders=sliders)
+    else:
+        for trace in rrg_traces(
+            df, latest_points, max_points_per_ticker, gl_threshold, max_gl_tail_points
+        ):
+            fig.add_trace(trace)
     # Add quadrant coloring using shapes
     fig.update_layout(
         height=600,
@@ -207,6 +176,310 @@ def plot_rrg(
     return fig
 
 
+def rrg_tails(df: pd.DataFrame, max_points_per_ticker: int = None) -> pd.DataFrame:
+    """
+    The plotted tail of every symbol in one pass: rows sorted by symbol then date,
+    cut to the last `max_points_per_ticker`, with `From_End` (0 = the latest row).
+    Rows without finite RS-Ratio and RS-Momentum (e.g. the warm-up bars) are
+    dropped first, so decimation and smoothing only ever see real points.
+    """
+    finite = np.isfinite(df["RS_Ratio"].to_numpy(dtype=float)) & np.isfinite(
+        df["RS_Momentum"].to_numpy(dtype=float)
+    )
+    tails = df[finite].sort_values(["Symbol", "Date"], kind="stable")
+    from_end = tails.groupby("Symbol", sort=False).cumcount(ascending=False)
+    tails = tails.assign(From_End=from_end.to_numpy())
+    if max_points_per_ticker is not None:
+        tails = tails[tails["From_End"] < max_points_per_ticker]
+    return tails.reset_index(drop=True)
+
+
+def with_gaps(values: np.ndarray, group_end: np.ndarray) -> np.ndarray:
+    """
+    Copy of `values` with a NaN (sent to Plotly as null) after the last value of each
+    group, so one line trace draws many separate polylines.
+    """
+    out = np.full(len(values) + int(group_end.sum()), np.nan)
+    out[np.arange(len(values)) + np.cumsum(group_end) - group_end] = values
+    return out
+
+
+def rrg_traces(
+    df: pd.DataFrame,
+    latest_points: pd.DataFrame,
+    max_points_per_ticker: int = None,
+    gl_threshold: int = GL_POINT_THRESHOLD,
+    max_gl_tail_points: int = 500,
+):
+    """
+    Batched RRG traces for every symbol: one tail line per quadrant color (NaN gaps
+    between symbols) plus single marker traces with per-point colors and opacities
+    for the tail points, the previous points and the labelled latest points.
+    Dense tails (more than `gl_threshold` points) switch to Scattergl; see plot_rrg.
+    """
+    tails = rrg_tails(df, max_points_per_ticker)
+    symbols = tails["Symbol"].to_numpy()
+    dates = tails["Date"].to_numpy()
+    x = tails["RS_Ratio"].to_numpy(dtype=float)
+    y = tails["RS_Momentum"].to_numpy(dtype=float)
+    from_end = tails["From_End"].to_numpy()
+    use_gl = gl_threshold is not None and len(tails) > gl_threshold
+    TailScatter = go.Scattergl if use_gl else go.Scatter
+
+    # Use latest_points for label/quadrant, classified for every symbol at once
+    latest = latest_points.drop_duplicates("Symbol").set_index("Symbol")
+    latest = latest.reindex(pd.unique(symbols))
+    codes = classify_quadrants(latest["RS_Ratio"], latest["RS_Momentum"])
+    symbol_codes = pd.Series(codes, index=latest.index)
+    point_codes = symbol_codes.reindex(symbols).to_numpy()
+
+    traces = []
+    # Spline line for the trail, one trace per color with gaps between symbols
+    group_end = from_end == 0
+    # Previous point: open marker (directionality), picked before any downsampling
+    prev = from_end == 1
+    prev_x, prev_y, prev_codes = x[prev], y[prev], point_codes[prev]
+    _, tail_lengths = group_bounds(group_end)
+    samples = TAIL_SMOOTHER.samples
+    if use_gl:
+        # LTTB keeps each tail's shape (and its first and latest points) in fewer
+        # points, within both the per-tail and the whole-figure budget
+        n_out = min(max_gl_tail_points, max(3, GL_POINT_BUDGET // len(tail_lengths)))
+        keep = lttb_indices(x, y, group_end, n_out)
+        x, y, from_end, group_end = x[keep], y[keep], from_end[keep], group_end[keep]
+        point_codes = point_codes[keep]
+        # Fewer interpolated points per segment when the figure is dense
+        samples = int(np.clip(GL_LINE_POINT_BUDGET // len(x), 1, samples))
+    # WebGL has no spline lines: draw pre-interpolated curves instead
+    if use_gl:
+        ends = np.flatnonzero(group_end)
+        _, kept_lengths = group_bounds(group_end)
+        # (symbol, last date, tail length), plus the kept point count and the latest
+        # point so other decimations, benchmarks or timeframes never share a curve
+        keys = list(
+            zip(
+                symbols[ends], dates[ends], tail_lengths, kept_lengths, x[ends], y[ends]
+            )
+        )
+        line_x, line_y, line_end = TAIL_SMOOTHER.smooth(keys, x, y, group_end, samples)
+        line_codes = point_codes[ends][np.cumsum(line_end) - line_end]
+    else:
+        line_x, line_y, line_end, line_codes = x, y, group_end, point_codes
+    for code in np.unique(line_codes):
+        rows = line_codes == code
+        traces.append(
+            tail_line_trace(
+                line_x[rows],
+                line_y[rows],
+                line_end[rows],
+                quadrant_color_array(code, QUADRANT_COLORS_MID),
+                TailScatter,
+                spline=not use_gl,
+            )
+        )
+    traces.append(
+        tail_marker_trace(
+            x, y, from_end, coded_colors(point_codes, QUADRANT_COLORS_MID), TailScatter
+        )
+    )
+    traces.append(
+        previous_trace(prev_x, prev_y, coded_colors(prev_codes, QUADRANT_COLORS_MID))
+    )
+    traces.append(
+        latest_trace(
+            latest["RS_Ratio"].to_numpy(dtype=float),
+            latest["RS_Momentum"].to_numpy(dtype=float),
+            dict(color=quadrant_color_array(codes, QUADRANT_COLORS_MID)),
+            dict(color=quadrant_color_array(codes, QUADRANT_COLORS_TEXT, "#000000")),
+            latest.index.to_numpy(),
+        )
+    )
+    return traces
+
+
+def tail_line_trace(x, y, group_end, color, Scatter=go.Scatter, spline=True):
+    """One line trace for many tails, with a gap after each group."""
+    line = dict(color=color, width=4)
+    if spline:
+        line["shape"] = "spline"
+    return Scatter(
+        x=with_gaps(x, group_end),
+        y=with_gaps(y, group_end),
+        mode="lines",
+        line=line,
+        showlegend=False,
+        hoverinfo="skip",
+    )
+
+
+def tail_marker_trace(x, y, from_end, color: dict, Scatter=go.Scatter):
+    """
+    Markers for all tail points, faded except the last two of each tail.
+    `color` holds the marker color settings: per-point colors or coded_colors.
+    """
+    opacity = np.select([from_end == 0, from_end == 1], [1.0, 0.6], default=0.2)
+    return Scatter(
+        x=x,
+        y=y,
+        mode="markers",
+        marker=dict(size=6, opacity=opacity, **color),
+        showlegend=False,
+        hoverinfo="skip",
+    )
+
+
+def previous_trace(x, y, color: dict):
+    """Previous points as open markers (directionality)."""
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode="markers",
+        marker=dict(
+            size=12,
+            symbol="circle-open",
+            line=dict(width=2, **color),
+            **color,
+        ),
+        showlegend=False,
+        hoverinfo="skip",
+    )
+
+
+def latest_trace(x, y, fill: dict, outline: dict, labels):
+    """Latest points as filled markers, colored by quadrant and labelled."""
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode="markers+text",
+        marker=dict(size=14, symbol="circle", line=dict(width=2, **outline), **fill),
+        text=labels,
+        textposition="top right",
+        showlegend=False,
+        hoverinfo="skip",
+    )
+
+
+def coded_colors(codes, colors) -> dict:
+    """
+    Marker color settings that send quadrant codes as numbers through a colorscale.
+    Plotly validates and serializes numeric arrays far faster than color strings.
+    """
+    return dict(color=codes, cmin=-1, cmax=3, colorscale=quadrant_colorscale(colors))
+
+
+def rrg_frames(df: pd.DataFrame, tail_length: int, max_frames: int = None):
+    """
+    Animation frames over the RRG history in `df`: for every bar (the last
+    `max_frames` if set), each symbol's tail over the `tail_length` bars ending there.
+    Every frame has the same seven traces, so Plotly can tween between them: one tail
+    line per quadrant color (Leading, Improving, Weakening, Lagging), then the tail,
+    previous and latest markers. The geometry of all frames comes from one pass over
+    a (dates, symbols, 2) array.
+    Returns (dates, list of trace lists), one entry per frame.
+    """
+    wide = df.pivot(
+        index="Date", columns="Symbol", values=["RS_Ratio", "RS_Momentum"]
+    ).sort_index()
+    symbols = wide["RS_Ratio"].columns
+    coords = np.stack(
+        [
+            wide["RS_Ratio"].to_numpy(dtype=float),
+            wide["RS_Momentum"][symbols].to_numpy(dtype=float),
+        ],
+        axis=-1,
+    )
+    dates = wide.index
+    first = 0 if max_frames is None else max(len(dates) - max_frames, 0)
+
+    # NaN padding gives the first bars short tails: window t covers bars t-L+1..t
+    padding = np.full((tail_length - 1,) + coords.shape[1:], np.nan)
+    windows = sliding_window_view(
+        np.concatenate([padding, coords]), tail_length, axis=0
+    )[first:]
+    x, y = windows[:, :, 0], windows[:, :, 1]  # (frames, symbols, tail_length)
+    valid = np.isfinite(x) & np.isfinite(y)
+    # Valid points after each point in its tail: 0 is the latest, 1 the previous
+    from_end = np.cumsum(valid[..., ::-1], axis=-1)[..., ::-1] - valid
+    latest = valid & (from_end == 0)
+    has_point = latest.any(axis=-1)
+    latest_x = np.where(has_point, np.where(latest, x, 0).sum(axis=-1), np.nan)
+    latest_y = np.where(has_point, np.where(latest, y, 0).sum(axis=-1), np.nan)
+    codes = classify_quadrants(latest_x, latest_y)
+    point_codes = np.broadcast_to(codes[..., None], valid.shape)
+    line_colors = quadrant_color_array(np.arange(4), QUADRANT_COLORS_MID)
+    labels = np.asarray(symbols, dtype=object)
+
+    frames = []
+    for f in range(len(windows)):
+        rows = valid[f]
+        fx, fy, fe, fc = x[f][rows], y[f][rows], from_end[f][rows], point_codes[f][rows]
+        traces = [
+            tail_line_trace(fx[fc == c], fy[fc == c], fe[fc == c] == 0, line_colors[c])
+            for c in range(4)
+        ]
+        traces.append(
+            tail_marker_trace(fx, fy, fe, coded_colors(fc, QUADRANT_COLORS_MID))
+        )
+        prev = fe == 1
+        traces.append(
+            previous_trace(
+                fx[prev], fy[prev], coded_colors(fc[prev], QUADRANT_COLORS_MID)
+            )
+        )
+        here = has_point[f]
+        traces.append(
+            latest_trace(
+                latest_x[f][here],
+                latest_y[f][here],
+                coded_colors(codes[f][here], QUADRANT_COLORS_MID),
+                coded_colors(codes[f][here], QUADRANT_COLORS_TEXT),
+                labels[here],
+            )
+        )
+        frames.append(traces)
+    return dates[first:], frames
+
+
+def animation_controls(dates, frame_ms: int = 150):
+    """Play/Pause buttons and a date slider that step through frames named by date."""
+    still = {"mode": "immediate", "frame": {"duration": 0, "redraw": False}}
+    play = {
+        "frame": {"duration": frame_ms, "redraw": False},
+        "transition": {"duration": 0},
+        "fromcurrent": True,
+    }
+    names = [d.strftime("%Y-%m-%d") for d in dates]
+    updatemenus = [
+        dict(
+            type="buttons",
+            direction="left",
+            x=0,
+            y=-0.12,
+            xanchor="left",
+            yanchor="top",
+            showactive=False,
+            buttons=[
+                dict(label="Play", method="animate", args=[None, play]),
+                dict(label="Pause", method="animate", args=[[None], still]),
+            ],
+        )
+    ]
+    sliders = [
+        dict(
+            active=len(names) - 1,
+            x=0.12,
+            y=-0.08,
+            len=0.88,
+            currentvalue=dict(prefix="As of "),
+            steps=[
+                dict(label=name, method="animate", args=[[name], still])
+                for name in names
+            ],
+        )
+    ]
+    return names, updatemenus, sliders
+
+
 def plot_rrg_diff(
     diff_df,
     max_points_per_ticker=1,
@@ -216,67 +489,84 @@ def plot_rrg_diff(
     """
     Plots a dumbbell (line+marker) for each symbol, connecting LTF to HTF in RRG space.
     Each endpoint is colored by its quadrant. Arrow and marker style indicate direction.
+    All symbols share three traces (connectors, LTF markers, labelled HTF markers)
+    and one list of arrow annotations.
     """
     fig = go.Figure()
     x_range = [95, 105] if fix_axes else None
     y_range = [95, 105] if fix_axes else None
 
-    for _, row in diff_df.iterrows():
-        symbol = row["Symbol"]
-        x0, y0 = row["RS_Ratio_LTF"], row["RS_Momentum_LTF"]
-        x1, y1 = row["RS_Ratio_HTF"], row["RS_Momentum_HTF"]
-        q0 = assign_quadrant(x0, y0)
-        q1 = assign_quadrant(x1, y1)
-        color0 = QUADRANT_COLORS_MID.get(q0, "#888888")
-        color1 = QUADRANT_COLORS_MID.get(q1, "#888888")
-        text_color = QUADRANT_COLORS_TEXT.get(q1, "#000000")
-
-        # Line connecting LTF to HTF
-        fig.add_trace(
-            go.Scatter(
-                x=[x0, x1],
-                y=[y0, y1],
-                mode="lines",
-                line=dict(color="#888", width=2, dash="dot"),
-                showlegend=False,
-                hoverinfo="skip",
-            )
+    # Endpoint quadrants and colors for every symbol in one pass
+    codes_ltf = classify_quadrants(diff_df["RS_Ratio_LTF"], diff_df["RS_Momentum_LTF"])
+    codes_htf = classify_quadrants(diff_df["RS_Ratio_HTF"], diff_df["RS_Momentum_HTF"])
+    colors_ltf = quadrant_color_array(codes_ltf, QUADRANT_COLORS_MID)
+    colors_htf = quadrant_color_array(codes_htf, QUADRANT_COLORS_MID)
+    text_colors = quadrant_color_array(codes_htf, QUADRANT_COLORS_TEXT, "#000000")
+
+    x0 = diff_df["RS_Ratio_LTF"].to_numpy(dtype=float)
+    y0 = diff_df["RS_Momentum_LTF"].to_numpy(dtype=float)
+    x1 = diff_df["RS_Ratio_HTF"].to_numpy(dtype=float)
+    y1 = diff_df["RS_Momentum_HTF"].to_numpy(dtype=float)
+    symbols = diff_df["Symbol"].to_numpy(dtype=object)
+    pair_end = np.tile([False, True], len(diff_df))
+
+    # Lines connecting LTF to HTF, one trace with a gap after every pair
+    fig.add_trace(
+        go.Scatter(
+            x=with_gaps(np.column_stack([x0, x1]).ravel(), pair_end),
+            y=with_gaps(np.column_stack([y0, y1]).ravel(), pair_end),
+            mode="lines",
+            line=dict(color="#888", width=2, dash="dot"),
+            showlegend=False,
+            hoverinfo="skip",
         )
-        # LTF marker (open circle)
-        fig.add_trace(
-            go.Scatter(
-                x=[x0],
-                y=[y0],
-                mode="markers",
-                marker=dict(
-                    size=12,
-                    color=color0,
-                    symbol="circle-open",
-                    line=dict(width=2, color=color0),
-                ),
-                showlegend=False,
-                hoverinfo="skip",
-            )
+    )
+    # LTF markers (open circles)
+    fig.add_trace(
+        go.Scatter(
+            x=x0,
+            y=y0,
+            mode="markers",
+            marker=dict(
+                size=12,
+                color=colors_ltf,
+                symbol="circle-open",
+                line=dict(width=2, color=colors_ltf),
+            ),
+            showlegend=False,
+            hoverinfo="skip",
         )
-        # HTF marker (filled circle, with label)
-        fig.add_trace(
-            go.Scatter(
-                x=[x1],
-                y=[y1],
-                mode="markers+text",
-                marker=dict(
-                    size=14,
-                    color=color1,
-                    symbol="circle",
-                    line=dict(width=2, color=text_color),
-                ),
-                text=[symbol],
-                textposition="top right",
-                name=symbol,
-                showlegend=False,
-                hoverinfo="skip",
-            )
+    )
+    # HTF markers (filled circles, with labels)
+    fig.add_trace(
+        go.Scatter(
+            x=x1,
+            y=y1,
+            mode="markers+text",
+            marker=dict(
+                size=14,
+                color=colors_htf,
+                symbol="circle",
+                line=dict(width=2, color=text_colors),
+            ),
+            text=symbols,
+            textposition="top right",
+            showlegend=False,
+            hoverinfo="skip",
         )
+    )
+    # Direction arrows from LTF to HTF; shared styling lives in the template defaults
+    moved = np.isfinite(x0 + y0 + x1 + y1) & ((x0 != x1) | (y0 != y1))
+    arrows = [
+        dict(x=x, y=y, ax=ax, ay=ay, arrowcolor=color)
+        for x, y, ax, ay, color in zip(
+            x1[moved].tolist(),
+            y1[moved].tolist(),
+            x0[moved].tolist(),
+            y0[moved].tolist(),
+            colors_htf[moved],
+        )
+    ]
 
     # Add quadrant coloring using shapes (optional, as in your RRG plot)
     if fix_axes:
@@ -343,5 +633,18 @@ def plot_rrg_diff(
         height=600,
         uniformtext_minsize=10,
         uniformtext_mode="hide",
+        annotations=arrows,
+    )
+    fig.layout.template.layout.annotationdefaults = dict(
+        xref="x",
+        yref="y",
+        axref="x",
+        ayref="y",
+        showarrow=True,
+        arrowhead=2,
+        arrowsize=1,
+        arrowwidth=1.5,
+        standoff=7,
+        text="",
     )
     return fig
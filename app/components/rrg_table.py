@@ -1,7 +1,20 @@
 import numpy as np
 import pandas as pd
 
-from .quadrant_colors import QUADRANT_COLORS
+from .quadrant_colors import QUADRANT_COLORS, QUADRANT_ORDER
+
+
+def classify_quadrants(rs_ratio, rs_momentum) -> np.ndarray:
+    """
+    Array form of assign_quadrant: an int8 index into QUADRANT_ORDER for every element
+    (same >= 100 boundaries), or -1 where either coordinate is NaN.
+    """
+    rs_ratio = np.asarray(rs_ratio, dtype=float)
+    rs_momentum = np.asarray(rs_momentum, dtype=float)
+    # Bit 0 is "left of 100", bit 1 is "below 100": Leading, Improving, Weakening, Lagging
+    codes = (rs_ratio < 100).astype(np.int8) + 2 * (rs_momentum < 100).astype(np.int8)
+    missing = np.isnan(rs_ratio) | np.isnan(rs_momentum)
+    return np.where(missing, np.int8(-1), codes).astype(np.int8)
 
 
 def assign_quadrant(rs_ratio, rs_momentum):
@@ -19,38 +32,33 @@ def build_rrg_table(category_dfs):
     """
     category_dfs: list of (df, category_name) tuples, where df has columns ['Symbol', 'Date', 'RS_Ratio', 'RS_Momentum']
     Returns: ranked DataFrame with columns: Symbol, Category, Quadrant, Prev_Quadrant, Distance
+    All categories are concatenated once; quadrants (a categorical in QUADRANT_ORDER),
+    distances and the ranking are computed as whole-column array operations.
     """
-    rows = []
-    for df, category in category_dfs:
-        if df is None or df.empty:
-            continue
-        for _, row in df.iterrows():
-            # row is already the latest for this symbol
-            rows.append(
-                {
-                    "Symbol": row["Symbol"],
-                    "Quadrant": assign_quadrant(row["RS_Ratio"], row["RS_Momentum"]),
-                    "Distance": round(
-                        np.sqrt(
-                            (row["RS_Ratio"] - 100) ** 2
-                            + (row["RS_Momentum"] - 100) ** 2
-                        ),
-                        2,
-                    ),
-                    "MFC": row.get("Momentum_Flip_Count", None),
-                }
-            )
-    table = pd.DataFrame(rows)
-    if table.empty:
+    frames = [df for df, _ in category_dfs if df is not None and not df.empty]
+    if not frames:
         # Return empty DataFrame with expected columns
         return pd.DataFrame(
             columns=["Symbol", "Quadrant", "Distance", "MFC"]
         ), QUADRANT_COLORS
+    # Each row is already the latest for its symbol
+    latest = pd.concat(frames, ignore_index=True)
+    rs_ratio = latest["RS_Ratio"].to_numpy(dtype=float)
+    rs_momentum = latest["RS_Momentum"].to_numpy(dtype=float)
+    # A NaN coordinate falls through to Lagging, as it does in assign_quadrant
+    codes = classify_quadrants(rs_ratio, rs_momentum)
+    codes = np.where(codes < 0, QUADRANT_ORDER.index("Lagging"), codes)
+    distance = np.round(np.hypot(rs_ratio - 100, rs_momentum - 100), 2)
+    table = pd.DataFrame(
+        {
+            "Symbol": latest["Symbol"].to_numpy(),
+            "Quadrant": pd.Categorical.from_codes(codes, categories=QUADRANT_ORDER),
+            "Distance": distance,
+            "MFC": latest.get("Momentum_Flip_Count"),
+        }
+    )
     # Rank by quadrant (Leading > Improving > Weakening > Lagging), then by distance (descending)
-    quadrant_order = ["Leading", "Improving", "Weakening", "Lagging"]
-    table["QuadrantRank"] = table["Quadrant"].apply(lambda q: quadrant_order.index(q))
-    table = table.sort_values(["QuadrantRank", "Distance"], ascending=[True, False])
-    table = table.drop(columns=["QuadrantRank"])
+    table = table.iloc[np.lexsort((-distance, codes))]
     table = style_quadrant_column(table, QUADRANT_COLORS)
     return table, QUADRANT_COLORS
 
@@ -0,0 +1,202 @@
+# Batched tail geometry for the RRG plots. Tails for many symbols are passed as one
+# concatenated array, ordered symbol by symbol, with `group_end` marking the last
+# point of each symbol's tail.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def group_bounds(group_end: np.ndarray):
+    """(starts, lengths) of the groups delimited by `group_end`."""
+    ends = np.flatnonzero(group_end)
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(int)
+    return starts, ends - starts + 1
+
+
+def lttb_indices(
+    x: np.ndarray, y: np.ndarray, group_end: np.ndarray, n_out: int
+) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets downsampling of every group to `n_out` points.
+    Returns the sorted row indices to keep; groups already at or below `n_out`
+    points are kept whole, and each group's first and last points always survive.
+    All groups are processed together, one bucket at a time. x and y must be
+    finite: the bucket means come from one running sum over every group.
+    """
+    starts, lengths = group_bounds(group_end)
+    big = lengths > max(n_out, 2)
+    if n_out < 3 or not big.any():
+        return np.arange(len(x))
+    s0, length = starts[big], lengths[big]
+    groups = np.arange(len(s0))
+
+    # Interior points 1..length-2 split into n_out - 2 buckets per group
+    fractions = np.linspace(0, 1, n_out - 1)
+    edges = s0[:, None] + 1 + np.floor(fractions * (length[:, None] - 2)).astype(int)
+    widest = int(np.diff(edges, axis=1).max())
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+
+    selected = np.empty((len(s0), n_out), dtype=int)
+    selected[:, 0] = s0
+    selected[:, -1] = s0 + length - 1
+    a = s0
+    for b in range(n_out - 2):
+        lo, hi = edges[:, b], edges[:, b + 1]
+        # Third vertex: mean of the next bucket, or the last point for the final one
+        if b < n_out - 3:
+            nhi = edges[:, b + 2]
+            mx = (cx[nhi] - cx[hi]) / (nhi - hi)
+            my = (cy[nhi] - cy[hi]) / (nhi - hi)
+        else:
+            mx, my = x[s0 + length - 1], y[s0 + length - 1]
+        cand = lo[:, None] + np.arange(widest)[None, :]
+        in_bucket = cand < hi[:, None]
+        cand = np.minimum(cand, hi[:, None] - 1)
+        area = np.abs(
+            (x[a] - mx)[:, None] * (y[cand] - y[a][:, None])
+            - (x[a][:, None] - x[cand]) * (my - y[a])[:, None]
+        )
+        a = cand[groups, np.argmax(np.where(in_bucket, area, -1.0), axis=1)]
+        selected[:, b + 1] = a
+
+    keep = np.ones(len(x), dtype=bool)
+    keep[np.repeat(big, lengths)] = False
+    keep[selected.ravel()] = True
+    return np.flatnonzero(keep)
+
+
+def catmull_rom(x: np.ndarray, y: np.ndarray, group_end: np.ndarray, samples: int = 8):
+    """
+    Uniform Catmull-Rom curves through every group's points, for renderers without
+    spline lines (Scattergl). Each segment is sampled `samples` times; end tangents
+    reuse the end points. Returns (x, y, group_end) of the interpolated polylines.
+    """
+    n = len(x)
+    if n == 0 or samples <= 1:
+        return x, y, group_end
+    group_start = np.ones(n, dtype=bool)
+    group_start[1:] = group_end[:-1]
+
+    # Segment i runs from point i to i + 1 within a group
+    seg = np.flatnonzero(~group_end)
+    p0 = np.where(group_start[seg], seg, seg - 1)
+    p3 = np.where(group_end[seg + 1], seg + 1, np.minimum(seg + 2, n - 1))
+    t = np.arange(samples) / samples
+    t2, t3 = t * t, t * t * t
+    basis = np.stack(
+        [
+            -0.5 * t3 + t2 - 0.5 * t,
+            1.5 * t3 - 2.5 * t2 + 1,
+            -1.5 * t3 + 2 * t2 + 0.5 * t,
+            0.5 * t3 - 0.5 * t2,
+        ]
+    )
+
+    def curve(v):
+        points = np.stack([v[p0], v[seg], v[seg + 1], v[p3]], axis=1)
+        return points @ basis
+
+    # Each segment start expands to `samples` points; each group's last point stays one
+    counts = np.where(group_end, 1, samples)
+    offsets = np.cumsum(counts) - counts
+    out_x = np.empty(counts.sum())
+    out_y = np.empty(counts.sum())
+    out_end = np.zeros(counts.sum(), dtype=bool)
+    slots = offsets[seg][:, None] + np.arange(samples)[None, :]
+    out_x[slots] = curve(x)
+    out_y[slots] = curve(y)
+    ends = np.flatnonzero(group_end)
+    out_x[offsets[ends]] = x[ends]
+    out_y[offsets[ends]] = y[ends]
+    out_end[offsets[ends]] = True
+    return out_x, out_y, out_end
+
+
+class TailSmoother:
+    """
+    Memoized catmull_rom curves, one per tail key such as (symbol, last date, tail
+    length). Tails seen before are looked up; all the others are interpolated together
+    in one batched call. The least recently used curves are dropped once more than
+    `max_points` curve points are stored. Safe to share between threads.
+    """
+
+    def __init__(self, samples: int = 8, max_points: int = 500000):
+        self.samples = samples
+        self.max_points = max_points
+        self._curves = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._curves)
+
+    @property
+    def points(self) -> int:
+        """Curve points currently stored."""
+        return self._points
+
+    def clear(self):
+        with self._lock:
+            self._curves.clear()
+            self._points = 0
+
+    def smooth(
+        self,
+        keys,
+        x: np.ndarray,
+        y: np.ndarray,
+        group_end: np.ndarray,
+        samples: int = None,
+    ):
+        """
+        catmull_rom(x, y, group_end, samples) with one hashable key per group (in
+        order), `samples` defaulting to self.samples. A key must identify its tail's
+        points: equal keys (at the same sampling) return the cached curve.
+        """
+        samples = self.samples if samples is None else samples
+        keys = [(key, samples) for key in keys]
+        curves = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._curves:
+                    self._curves.move_to_end(key)
+                    curves[i] = self._curves[key]
+
+        missing = [i for i, curve in enumerate(curves) if curve is None]
+        if missing:
+            starts, lengths = group_bounds(group_end)
+            rows = np.concatenate(
+                [np.arange(starts[i], starts[i] + lengths[i]) for i in missing]
+            )
+            cx, cy, cend = catmull_rom(x[rows], y[rows], group_end[rows], samples)
+            bounds = np.concatenate([[0], np.flatnonzero(cend) + 1])
+            for i, lo, hi in zip(missing, bounds[:-1], bounds[1:]):
+                # Copies, so a stored curve does not keep the whole batch alive
+                curves[i] = (cx[lo:hi].copy(), cy[lo:hi].copy())
+            with self._lock:
+                for i in missing:
+                    self._store(keys[i], curves[i])
+
+        if not curves:
+            return x[:0], y[:0], group_end[:0]
+        out_end = np.zeros(sum(len(cx) for cx, _ in curves), dtype=bool)
+        out_end[np.cumsum([len(cx) for cx, _ in curves]) - 1] = True
+        return (
+            np.concatenate([cx for cx, _ in curves]),
+            np.concatenate([cy for _, cy in curves]),
+            out_end,
+        )
+
+    def _store(self, key, curve):
+        """Add a curve and evict the least recently used ones; hold the lock."""
+        old = self._curves.pop(key, None)
+        if old is not None:
+            self._points -= len(old[0])
+        self._curves[key] = curve
+        self._points += len(curve[0])
+        while self._points > self.max_points:
+            _, (cx, _) = self._curves.popitem(last=False)
+            self._points -= len(cx)
@@ -0,0 +1,150 @@
+# Vectorized backtests of quadrant-rotation rules over the full RRG history.
+# e.g. "hold what moved Improving -> Leading, until it leaves Leading".
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from components.rrg_table import QUADRANT_ORDER, classify_quadrants
+
+from .panel import RRGPanel
+
+# Position codes come from the same classifier as the tables and plots
+QUADRANTS = QUADRANT_ORDER
+
+
+def _quadrant_set(names: Iterable[str]) -> np.ndarray:
+    unknown = set(names) - set(QUADRANTS)
+    if unknown:
+        raise ValueError(f"Unknown quadrants: {sorted(unknown)}")
+    return np.array([QUADRANTS.index(n) for n in names], dtype=np.int8)
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Carry each column's last finite value forward along the date axis."""
+    rows = np.arange(len(values))[:, None]
+    last = np.maximum.accumulate(np.where(np.isfinite(values), rows, 0), axis=0)
+    return np.take_along_axis(values, last, axis=0)
+
+
+def quadrant_positions(
+    rs_ratio: np.ndarray,
+    rs_momentum: np.ndarray,
+    hold: Iterable[str] = ("Leading",),
+    entry_from: Optional[Iterable[str]] = None,
+) -> np.ndarray:
+    """
+    Boolean (dates, symbols) position matrix: a symbol is held while it sits in one of
+    the `hold` quadrants. With `entry_from`, a stay in `hold` only counts if it began
+    with a move from one of those quadrants (e.g. hold=["Leading"],
+    entry_from=["Improving"] is the Improving -> Leading rule).
+    """
+    codes = classify_quadrants(rs_ratio, rs_momentum)
+    in_hold = np.isin(codes, _quadrant_set(hold))
+    if entry_from is None:
+        return in_hold
+
+    previous = np.full_like(codes, -1)
+    previous[1:] = codes[:-1]
+    was_in_hold = np.zeros_like(in_hold)
+    was_in_hold[1:] = in_hold[:-1]
+    run_start = in_hold & ~was_in_hold
+    valid_entry = run_start & np.isin(previous, _quadrant_set(entry_from))
+
+    # Carry each run's entry flag forward to every bar of the run
+    rows = np.arange(len(codes))[:, None]
+    start_idx = np.maximum.accumulate(np.where(run_start, rows, 0), axis=0)
+    return in_hold & np.take_along_axis(valid_entry, start_idx, axis=0)
+
+
+@dataclass
+class BacktestResult:
+    returns: pd.Series
+    equity: pd.Series
+    weights: pd.DataFrame
+    turnover: pd.Series
+
+    def summary(self, periods_per_year: float) -> pd.Series:
+        """
+        Headline statistics; `periods_per_year` is the number of bars in a year for
+        the panel's interval, e.g. providers.BARS_PER_YEAR["1wk"].
+        """
+        years = len(self.returns) / periods_per_year
+        total = self.equity.iloc[-1] - 1 if len(self.equity) else np.nan
+        vol = self.returns.std(ddof=0) * np.sqrt(periods_per_year)
+        mean = self.returns.mean() * periods_per_year
+        drawdown = self.equity / self.equity.cummax() - 1
+        return pd.Series(
+            {
+                "Total_Return": total,
+                "CAGR": (1 + total) ** (1 / years) - 1 if years > 0 else np.nan,
+                "Volatility": vol,
+                "Sharpe": mean / vol if vol > 0 else np.nan,
+                "Max_Drawdown": drawdown.min(),
+                "Avg_Turnover": self.turnover.mean(),
+            }
+        )
+
+
+def _wide(data, column: str) -> pd.DataFrame:
+    return data.pivot(index="Date", columns="Symbol", values=column).sort_index()
+
+
+def backtest_quadrant_rotation(
+    data,
+    hold: Iterable[str] = ("Leading",),
+    entry_from: Optional[Iterable[str]] = None,
+    weighting: str = "equal",
+) -> BacktestResult:
+    """
+    Backtest a quadrant-rotation rule on an RRGPanel (or the long get_rrg_data frame).
+    Positions are decided on each bar's close and earn the next bar's return.
+    weighting="equal" splits capital evenly across held symbols; "distance" weights
+    them by their distance from the (100, 100) centre.
+    A symbol's missing bars inside its trading history (holidays, gaps in ragged
+    panels) are not decisions: its last position carries over, and its next return
+    is measured from its previous valid price.
+    """
+    if isinstance(data, RRGPanel):
+        dates, symbols = data.dates, data.symbols
+        price, rsr, rsm = data.price, data.rs_ratio, data.rs_momentum
+    else:
+        price_wide = _wide(data, "Price")
+        dates, symbols = price_wide.index, price_wide.columns
+        price = price_wide.to_numpy(dtype=float)
+        rsr = _wide(data, "RS_Ratio").reindex_like(price_wide).to_numpy(dtype=float)
+        rsm = _wide(data, "RS_Momentum").reindex_like(price_wide).to_numpy(dtype=float)
+
+    filled = _ffill(price)
+    trading = np.isfinite(filled) & np.isfinite(_ffill(price[::-1])[::-1])
+    rsr = np.where(trading, _ffill(rsr), np.nan)
+    rsm = np.where(trading, _ffill(rsm), np.nan)
+    positions = quadrant_positions(rsr, rsm, hold, entry_from)
+    if weighting == "equal":
+        raw = positions.astype(float)
+    elif weighting == "distance":
+        raw = np.where(positions, np.hypot(rsr - 100, rsm - 100), 0.0)
+    else:
+        raise ValueError(f"Unknown weighting: {weighting}")
+    total = raw.sum(axis=1, keepdims=True)
+    weights = np.divide(raw, total, out=np.zeros_like(raw), where=total > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_returns = np.zeros_like(price, dtype=float)
+        asset_returns[1:] = filled[1:] / filled[:-1] - 1
+    asset_returns = np.where(np.isfinite(asset_returns), asset_returns, 0.0)
+
+    # Weights set at the close of bar t earn the return of bar t + 1
+    held = np.zeros_like(weights)
+    held[1:] = weights[:-1]
+    portfolio = (held * asset_returns).sum(axis=1)
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0.0)).sum(axis=1)
+
+    returns = pd.Series(portfolio, index=dates, name="Return")
+    return BacktestResult(
+        returns=returns,
+        equity=(1 + returns).cumprod().rename("Equity"),
+        weights=pd.DataFrame(weights, index=dates, columns=symbols),
+        turnover=pd.Series(turnover, index=dates, name="Turnover"),
+    )
@@ -0,0 +1,190 @@
+# On-disk price store so repeated runs only download bars we don't already have.
+# Each (symbol, interval, auto_adjust) key is one Parquet file holding a single "Close" column.
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "rrgpy"
+
+
+class PriceCache:
+    """
+    Columnar (Parquet) price store keyed by (symbol, interval, auto_adjust).
+    Alongside the bars, an index.json records how far back each key is known to be
+    complete, so a request for a longer period than was ever fetched triggers a full
+    download instead of silently returning a short history.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        self._index = self._read_index()
+
+    @staticmethod
+    def key(symbol: str, interval: str, auto_adjust: bool = True) -> str:
+        safe_symbol = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+        return f"{safe_symbol}__{interval}__{'adj' if auto_adjust else 'raw'}"
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.parquet"
+
+    def _read_index(self) -> Dict[str, Optional[str]]:
+        if not self._index_path.exists():
+            return {}
+        try:
+            return json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, indent=1, sort_keys=True))
+        os.replace(tmp, self._index_path)
+
+    def load(self, symbol: str, interval: str, auto_adjust: bool = True):
+        """Return the cached close series for a key, or None if nothing is stored."""
+        path = self._path(self.key(symbol, interval, auto_adjust))
+        if not path.exists():
+            return None
+        try:
+            series = pd.read_parquet(path)["Close"]
+        except Exception:
+            # A corrupt or half-written file is treated as a cache miss
+            return None
+        series.name = symbol
+        return series
+
+    def covers(
+        self, symbol: str, interval: str, start, auto_adjust: bool = True
+    ) -> bool:
+        """
+        True if the stored history for this key is complete from `start` onwards.
+        `start=None` means the full ("max") history.
+        """
+        key = self.key(symbol, interval, auto_adjust)
+        if key not in self._index or not self._path(key).exists():
+            return False
+        covered_from = self._index[key]
+        if covered_from is None:
+            return True
+        if start is None:
+            return False
+        return pd.Timestamp(covered_from) <= pd.Timestamp(start)
+
+    def last_timestamp(self, symbol: str, interval: str, auto_adjust: bool = True):
+        series = self.load(symbol, interval, auto_adjust)
+        if series is None or series.dropna().empty:
+            return None
+        return series.dropna().index.max()
+
+    def refresh_start(self, symbol: str, interval: str, auto_adjust: bool = True):
+        """
+        Where an incremental download should start: the second-to-last stored bar,
+        so the new bars overlap one completed bar that readjusted() can check.
+        None if nothing is stored.
+        """
+        series = self.load(symbol, interval, auto_adjust)
+        if series is None or series.dropna().empty:
+            return None
+        index = series.dropna().index
+        return index[-2] if len(index) > 1 else index[-1]
+
+    def readjusted(
+        self,
+        symbol: str,
+        interval: str,
+        new_bars: pd.Series,
+        auto_adjust: bool = True,
+        rtol: float = 1e-5,
+    ) -> bool:
+        """
+        True if `new_bars` disagree with the stored completed bars they overlap (all
+        but the last stored bar, which may still have been forming). Adjusted closes
+        only change that way when a split or dividend rescales the whole history,
+        so the stored series no longer matches the provider's.
+        """
+        existing = self.load(symbol, interval, auto_adjust)
+        if existing is None:
+            return False
+        existing = existing.dropna()
+        completed = existing.iloc[:-1]
+        new_bars = new_bars.dropna()
+        overlap = completed.index.intersection(new_bars.index)
+        if overlap.empty:
+            return False
+        old, new = completed[overlap].to_numpy(), new_bars[overlap].to_numpy()
+        return not np.allclose(new, old, rtol=rtol, atol=0.0)
+
+    def drop(self, symbol: str, interval: str, auto_adjust: bool = True):
+        """Forget a key's bars and its completeness marker."""
+        key = self.key(symbol, interval, auto_adjust)
+        self._path(key).unlink(missing_ok=True)
+        if self._index.pop(key, "missing") != "missing":
+            self._write_index()
+
+    def merge(
+        self,
+        symbol: str,
+        interval: str,
+        new_bars: pd.Series,
+        auto_adjust: bool = True,
+        covered_from="unchanged",
+    ) -> pd.Series:
+        """
+        Merge freshly downloaded bars into the store and return the combined series.
+        Overlapping timestamps take the new value, so a partial (still forming) last
+        bar is replaced on the next refresh.
+        `covered_from` updates the completeness marker: a timestamp, None for "max",
+        or "unchanged" for incremental appends.
+        """
+        key = self.key(symbol, interval, auto_adjust)
+        new_bars = new_bars.dropna()
+        existing = self.load(symbol, interval, auto_adjust)
+        if existing is not None and not existing.empty:
+            combined = pd.concat([existing[~existing.index.isin(new_bars.index)], new_bars])
+        else:
+            combined = new_bars
+        combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        combined.name = symbol
+        combined.index.name = "Date"
+        combined.to_frame(name="Close").to_parquet(self._path(key))
+
+        if covered_from != "unchanged":
+            previous = self._index.get(key, "missing")
+            if previous is None or covered_from is None:
+                self._index[key] = None
+            elif previous == "missing":
+                self._index[key] = pd.Timestamp(covered_from).isoformat()
+            else:
+                self._index[key] = min(
+                    pd.Timestamp(previous), pd.Timestamp(covered_from)
+                ).isoformat()
+            self._write_index()
+        return combined
+
+    def clear(self):
+        for path in self.root.glob("*.parquet"):
+            path.unlink()
+        self._index = {}
+        self._write_index()
+
+
+def get_price_cache() -> Optional[PriceCache]:
+    """
+    Default cache used by fetch_prices. The location can be moved with the
+    RRGPY_CACHE_DIR environment variable, or caching disabled by setting it to "off".
+    """
+    root = os.environ.get("RRGPY_CACHE_DIR", str(DEFAULT_CACHE_DIR))
+    if root.strip().lower() in ("", "off", "none", "0"):
+        return None
+    try:
+        return PriceCache(root)
+    except OSError:
+        # Read-only home directories (e.g. some containers) just run uncached
+        return None
@@ -0,0 +1,156 @@
+# Download scheduler for large universes: chunked, concurrent, rate-limited, with retries.
+# A bad ticker or a throttled request only costs its own chunk, never the whole download.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from .providers import PriceProvider, is_transient_message
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Rate limiting and network hiccups: worth retrying the same request after a
+    backoff, but not a reason to split the chunk (every half would hit it too).
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return is_transient_message(f"{type(error).__name__} {error}")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average, with bursts of
+    up to `capacity` requests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class ChunkedDownloader(PriceProvider):
+    """
+    Wraps another provider and splits large symbol lists into chunks that run on a
+    bounded thread pool. Every request waits on a shared token bucket, failed chunks
+    are retried with exponential backoff when the error is transient (is_transient),
+    and a chunk failing for any other reason is bisected so one poisoned symbol cannot
+    take its neighbours down with it. A chunk still throttled after its retries is
+    reported as failed rather than bisected.
+    Symbols that return no data end up in `last_failed` (and are simply absent from
+    the returned frame, which get_rrg_data reports as dropped tickers).
+    """
+
+    def __init__(
+        self,
+        provider: PriceProvider,
+        chunk_size: int = 100,
+        max_workers: int = 4,
+        requests_per_second: float = 2.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        sleep=time.sleep,
+    ):
+        self.provider = provider
+        self.name = f"chunked-{provider.name}"
+        self.cacheable = provider.cacheable
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self._bucket = TokenBucket(requests_per_second, sleep=sleep)
+        self.last_failed: List[str] = []
+
+    def _attempt(self, chunk, interval, period, start, auto_adjust, retries):
+        for attempt in range(retries + 1):
+            self._bucket.acquire()
+            try:
+                return self.provider.download(
+                    chunk, interval, period=period, start=start, auto_adjust=auto_adjust
+                )
+            except Exception as error:
+                # Only transient errors can succeed on a second try
+                if attempt == retries or not is_transient(error):
+                    raise
+                self._sleep(self.backoff * 2**attempt)
+
+    def _download_chunk(self, chunk, interval, period, start, auto_adjust, retries):
+        try:
+            data = self._attempt(chunk, interval, period, start, auto_adjust, retries)
+        except Exception as error:
+            if len(chunk) == 1 or is_transient(error):
+                return pd.DataFrame()
+            # Isolate the failure; the halves keep their retries for transient errors
+            mid = len(chunk) // 2
+            halves = [
+                self._download_chunk(
+                    part, interval, period, start, auto_adjust, retries
+                )
+                for part in (chunk[:mid], chunk[mid:])
+            ]
+            halves = [h for h in halves if not h.empty]
+            return pd.concat(halves, axis=1) if halves else pd.DataFrame()
+        if data is None or data.empty:
+            return pd.DataFrame()
+        return data.dropna(axis=1, how="all")
+
+    def download_with_failures(
+        self, symbols, interval, period=None, start=None, auto_adjust=True
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """Like download(), but also returns the symbols that produced no data."""
+        symbols = list(dict.fromkeys(symbols))
+        chunks = [
+            symbols[i : i + self.chunk_size]
+            for i in range(0, len(symbols), self.chunk_size)
+        ]
+        args = (interval, period, start, auto_adjust, self.max_retries)
+        if len(chunks) <= 1:
+            frames = [self._download_chunk(chunk, *args) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                frames = list(
+                    pool.map(lambda chunk: self._download_chunk(chunk, *args), chunks)
+                )
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(), symbols
+        data = pd.concat(frames, axis=1).sort_index()
+        data = data.loc[:, ~data.columns.duplicated()]
+        data.index.name = "Date"
+        failed = [s for s in symbols if s not in data.columns]
+        return data, failed
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        data, self.last_failed = self.download_with_failures(
+            symbols, interval, period=period, start=start, auto_adjust=auto_adjust
+        )
+        return data
@@ -0,0 +1,272 @@
+# Array engine for RRG calculations: every symbol at once, no per-symbol or per-date Python loops.
+# Arrays are time-major: axis 0 is the date, any trailing axes (symbols, benchmarks, ...) broadcast.
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def pack_valid(values: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Move each column's valid cells to the top of the column, keeping their order.
+    Rolling windows over the packed array then run over each column's own valid
+    observations (the ragged per-symbol history), with NaN padding at the bottom.
+    Returns (packed, order); pass `order` to unpack_valid to scatter results back.
+    """
+    order = np.argsort(~mask, axis=0, kind="stable")
+    packed = np.take_along_axis(np.where(mask, values, np.nan), order, axis=0)
+    return packed, order
+
+
+def unpack_valid(packed: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Inverse of pack_valid: put packed rows back on their original dates."""
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    return out
+
+
+def prefix_moments(x: np.ndarray, block: int = 256):
+    """
+    Prefix sums of count, value and squared value along axis 0, the building blocks
+    for rolling means and standard deviations of any window up to `block` bars.
+    The sums restart every `block` rows and each block is centred on its own mean, so
+    they stay small even for long trending series and the variance does not suffer
+    from cancellation. Arrays are (blocks, block + 1, ...) with a leading zero row per
+    block; the centres are (blocks, ...).
+    Non-finite values count as missing.
+    """
+    length = len(x)
+    n_blocks = -(-length // block)
+    padded = np.full((n_blocks * block,) + x.shape[1:], np.nan)
+    padded[:length] = x
+    blocks = padded.reshape((n_blocks, block) + x.shape[1:])
+    valid = np.isfinite(blocks)
+    n_valid = valid.sum(axis=1)
+    center = np.where(valid, blocks, 0.0).sum(axis=1) / np.maximum(n_valid, 1)
+    centred = np.where(valid, blocks - center[:, None], 0.0)
+    zero = np.zeros((n_blocks, 1) + x.shape[1:])
+    count = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+    s1 = np.concatenate([zero, np.cumsum(centred, axis=1)], axis=1)
+    s2 = np.concatenate([zero, np.cumsum(centred * centred, axis=1)], axis=1)
+    return count, s1, s2, center
+
+
+def moments_index(moments, index: int, axis: int = 0):
+    """prefix_moments of x.take(index, axis=axis + 1), read off the moments of x."""
+    count, s1, s2, center = moments
+    pick = (slice(None),) * (axis + 2) + (index,)
+    return count[pick], s1[pick], s2[pick], center[pick[1:]]
+
+
+def rolling_mean_std(
+    moments, window: int, length: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and population std (ddof=0) from prefix_moments, matching
+    pandas .rolling(window).mean()/.std(ddof=0): NaN unless the window is full.
+    """
+    count, s1, s2, center = moments
+    block = count.shape[1] - 1
+    if window > block:
+        raise ValueError(f"window {window} is longer than the moments block {block}")
+    shape = (length,) + count.shape[2:]
+    mean = np.full(shape, np.nan)
+    std = np.full(shape, np.nan)
+    if window > length:
+        return mean, std
+
+    # Window [a, b) ends in block kb and starts in kb or the block before it
+    b = np.arange(window, length + 1)
+    a = b - window
+    kb, ob = (b - 1) // block, (b - 1) % block + 1
+    ka, oa = a // block, a % block
+    same = (ka == kb).reshape((-1,) + (1,) * (count.ndim - 2))
+
+    def window_part(m):
+        head = np.where(same, 0.0, m[ka, block] - m[ka, oa])
+        tail = m[kb, ob] - np.where(same, m[kb, oa], 0.0)
+        return head, tail
+
+    (n_a, n_b), (s1_a, s1_b), (s2_a, s2_b) = map(window_part, (count, s1, s2))
+    # Move the head's sums onto the tail block's centre
+    shift = center[ka] - center[kb]
+    n = n_a + n_b
+    m1 = (s1_a + n_a * shift + s1_b) / window
+    m2 = (s2_a + 2 * shift * s1_a + n_a * shift * shift + s2_b) / window
+    var = m2 - m1 * m1
+    # Rounding can leave a tiny residue where the window is constant; pandas reports 0 there
+    var = np.where(var <= 1e-12 * m2, 0.0, var)
+    full = n == window
+    mean[window - 1 :] = np.where(full, m1 + center[kb], np.nan)
+    std[window - 1 :] = np.where(full, np.sqrt(var), np.nan)
+    return mean, std
+
+
+def rrg_arrays(
+    prices: np.ndarray, benchmark: np.ndarray, window: int, volatility: bool = False
+) -> Tuple[np.ndarray, ...]:
+    """
+    RS-Ratio and RS-Momentum for a whole price panel.
+    `prices` is (dates, ...) and `benchmark` broadcasts against it, e.g. (dates, 1).
+    Each column is computed over the dates where both it and the benchmark have a price.
+    Returns (rs_ratio, rs_momentum, mask), all shaped like the broadcast panel, plus
+    (rs_ratio_vol, rs_momentum_vol) when `volatility` is set.
+    """
+    rs_ratio, rs_momentum, mask, *vols = rrg_arrays_multi_window(
+        prices, benchmark, [window], volatility
+    )
+    return (rs_ratio[0], rs_momentum[0], mask) + tuple(v[0] for v in vols)
+
+
+def rrg_arrays_multi_window(
+    prices: np.ndarray,
+    benchmark: np.ndarray,
+    windows: Sequence[int],
+    volatility: bool = False,
+) -> Tuple[np.ndarray, ...]:
+    """
+    rrg_arrays for several smoothing windows in one pass.
+    RS and its prefix sums are computed once and every window's RS-Ratio is read off
+    them; the per-window ROC series are stacked and share a single prefix-sum pass too.
+    Returns (rs_ratio, rs_momentum, mask) with a leading window axis on the ratio and
+    momentum arrays: (windows, dates, ...).
+    With `volatility`, also returns the rolling std (ddof=0, same window) of RS-Ratio
+    and RS-Momentum over each column's own valid bars, shaped like rs_ratio. It is
+    read off one more prefix-sum pass over the packed results, before they are
+    scattered back to dates, so the noise band costs no extra pack/unpack.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = 100 * (prices / benchmark)
+    mask = np.isfinite(rs)
+    packed, order = pack_valid(rs, mask)
+    length = len(packed)
+
+    block = max(max(windows), 256)
+    rs_moments = prefix_moments(packed, block)
+    rsr = np.empty((length, len(windows)) + packed.shape[1:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # RS-Ratio: z-score of RS, shifted to the StockCharts 100 line
+        for i, window in enumerate(windows):
+            mean, std = rolling_mean_std(rs_moments, window, length)
+            rsr[:, i] = 100 + (packed - mean) / std
+        # RS-Ratio ROC: percent change from the previous valid bar
+        roc = np.full_like(rsr, np.nan)
+        roc[1:] = 100 * (rsr[1:] / rsr[:-1] - 1)
+        # RS-Momentum: z-score of the ROC, centred on 101 as in the original indicator
+        roc_moments = prefix_moments(roc, block)
+        rsm = np.empty_like(rsr)
+        for i, window in enumerate(windows):
+            moments = moments_index(roc_moments, i)
+            mean, std = rolling_mean_std(moments, window, length)
+            rsm[:, i] = 101 + (roc[:, i] - mean) / std
+
+    def unpack_windows(packed_windows):
+        return np.stack(
+            [unpack_valid(packed_windows[:, i], order) for i in range(len(windows))]
+        )
+
+    rs_ratio = unpack_windows(rsr)
+    rs_momentum = unpack_windows(rsm)
+    if not volatility:
+        return rs_ratio, rs_momentum, mask
+
+    # Noise band: rolling std of RS-Ratio and RS-Momentum, both in one prefix-sum pass
+    vol_moments = prefix_moments(np.stack([rsr, rsm], axis=1), block)
+    vol = np.empty((length, 2) + rsr.shape[1:])
+    for i, window in enumerate(windows):
+        moments = moments_index(vol_moments, i, axis=1)
+        _, vol[:, :, i] = rolling_mean_std(moments, window, length)
+    return (
+        rs_ratio,
+        rs_momentum,
+        mask,
+        unpack_windows(vol[:, 0]),
+        unpack_windows(vol[:, 1]),
+    )
+
+
+@dataclass
+class RRGTensor:
+    """
+    RS-Ratio / RS-Momentum for several variants of the same panel (e.g. one per
+    smoothing window), shaped (keys, symbols, dates). `key_name` labels the leading
+    axis and `keys` its values. The rolling volatilities are None unless requested.
+    """
+
+    key_name: str
+    keys: List
+    symbols: pd.Index
+    dates: pd.Index
+    rs_ratio: np.ndarray
+    rs_momentum: np.ndarray
+    mask: np.ndarray
+    rs_ratio_vol: Optional[np.ndarray] = None
+    rs_momentum_vol: Optional[np.ndarray] = None
+
+    def index(self, key) -> int:
+        return list(self.keys).index(key)
+
+    def frame(self, key) -> pd.DataFrame:
+        """Long-format (Symbol, Date, RS_Ratio, RS_Momentum) frame for one key."""
+        i = self.index(key)
+        return rrg_long_frame(
+            self.dates,
+            self.symbols,
+            self.rs_ratio[i].T,
+            self.rs_momentum[i].T,
+            self.mask[i].T,
+        )
+
+
+def rrg_long_frame(
+    dates: pd.Index,
+    symbols: pd.Index,
+    rs_ratio: np.ndarray,
+    rs_momentum: np.ndarray,
+    mask: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Long-format frame (Symbol, Date, RS_Ratio, RS_Momentum) for every valid cell of
+    (dates, symbols) arrays, ordered by symbol then date, built in one construction.
+    """
+    symbol_idx, date_idx = np.nonzero(mask.T)
+    return pd.DataFrame(
+        {
+            "Symbol": np.asarray(symbols, dtype=object)[symbol_idx],
+            "Date": dates[date_idx],
+            "RS_Ratio": rs_ratio[date_idx, symbol_idx],
+            "RS_Momentum": rs_momentum[date_idx, symbol_idx],
+        }
+    )
+
+
+def flip_count_array(
+    rs_ratio: np.ndarray, rs_momentum: np.ndarray, mask: np.ndarray
+) -> np.ndarray:
+    """
+    Momentum flip counts on (dates, symbols) arrays, equivalent to
+    finance.calculate_momentum_flip_count on the long frame of the `mask` cells:
+    RS-Momentum crossings of 100, reset whenever RS-Ratio changes half.
+    Counts are 0 outside the mask.
+    """
+    packed_rsr, order = pack_valid(rs_ratio, mask)
+    packed_rsm, _ = pack_valid(rs_momentum, mask)
+    n = len(packed_rsr)
+    if n == 0:
+        return np.zeros(rs_ratio.shape, dtype=int)
+
+    right = packed_rsr >= 100
+    segment_start = np.ones(packed_rsr.shape, dtype=bool)
+    segment_start[1:] = right[1:] != right[:-1]
+    previous = np.full_like(packed_rsm, np.nan)
+    previous[1:] = packed_rsm[:-1]
+    crossed = ((previous < 100) & (packed_rsm >= 100)) | (
+        (previous >= 100) & (packed_rsm < 100)
+    )
+    flips = np.cumsum(crossed & ~segment_start, axis=0)
+    rows = np.arange(n).reshape((n,) + (1,) * (flips.ndim - 1))
+    start_idx = np.maximum.accumulate(np.where(segment_start, rows, 0), axis=0)
+    counts = flips - np.take_along_axis(flips, start_idx, axis=0)
+    return np.where(mask, unpack_valid(counts, order), 0)
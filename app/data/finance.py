@@ -1,8 +1,17 @@
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from .cache import PriceCache, get_price_cache
+from .engine import (
+    RRGTensor,
+    rrg_arrays,
+    rrg_arrays_multi_window,
+    rrg_long_frame,
+)
+from .panel import RRGPanel
+from .providers import PriceProvider, get_default_provider, period_start
 
 period_options = ["1mo", "6mo", "1y", "2y", "5y", "10y", "max"]
 interval_map = {
@@ -24,75 +33,196 @@ window_map = {
     "max": 200,
 }
 
-# Define the schema for RRG data in one place
-RRG_DATA_COLUMNS = ["Symbol", "Date", "Price", "Benchmark", "RS_Ratio", "RS_Momentum"]
-
+# Pandas period frequency used to bucket daily closes into each coarser interval
+RESAMPLE_FREQ = {
+    "1wk": "W-SUN",
+    "1mo": "M",
+    "3mo": "Q",
+}
 
 def fetch_prices(
-    symbols: List[str], period: str = "1y", interval: str = "1d"
+    symbols: List[str],
+    period: str = "1y",
+    interval: str = "1d",
+    auto_adjust: bool = True,
+    cache: Optional[PriceCache] = None,
+    provider: Optional[PriceProvider] = None,
 ) -> pd.DataFrame:
     """
-    Fetch historical adjusted close prices for a list of symbols using yfinance.
+    Fetch historical adjusted close prices for a list of symbols from a PriceProvider
+    (yfinance unless configured otherwise, see get_default_provider).
     Returns a DataFrame with columns as symbols and index as dates.
+
+    Prices from remote providers go through the on-disk PriceCache (see get_price_cache):
+    symbols whose stored history already covers the period only download bars from
+    their last stored timestamps onwards; everything else is downloaded in full and
+    stored. A symbol whose overlapping bars no longer match (its adjusted history was
+    rescaled by a split or dividend) is downloaded again in full.
     """
-    data = yf.download(
-        symbols, period=period, interval=interval, auto_adjust=True, progress=False
-    )
-    if data.empty:
-        return pd.DataFrame()
+    provider = get_default_provider() if provider is None else provider
+    if not provider.cacheable:
+        return provider.download(
+            symbols, interval, period=period, auto_adjust=auto_adjust
+        )
+    cache = get_price_cache() if cache is None else cache
+    if cache is None:
+        return provider.download(
+            symbols, interval, period=period, auto_adjust=auto_adjust
+        )
 
-    # Always get 'Close' (already adjusted if auto_adjust=True)
-    if isinstance(data.columns, pd.MultiIndex):
-        # Select only the 'Close' price for all tickers
-        data = data["Close"]
-        # If only one ticker, data is a Series; convert to DataFrame
-        if isinstance(data, pd.Series):
-            data = data.to_frame(name=symbols[0])
+    start = period_start(period)
+    stale, refresh = [], {}
+    for symbol in symbols:
+        if cache.covers(symbol, interval, start, auto_adjust):
+            since = cache.refresh_start(symbol, interval, auto_adjust)
+            refresh.setdefault(since, []).append(symbol)
         else:
-            # Ensure columns are just ticker symbols
-            data.columns = [str(col) for col in data.columns]
-    else:
-        # Single ticker, single-level columns
-        data = data[["Close"]]
-        data.columns = [symbols[0]]
+            stale.append(symbol)
+
+    # One request per refresh start, so a stale or delisted symbol does not drag
+    # every other symbol's download back to its old date
+    for since, group in refresh.items():
+        if since is None:
+            continue
+        update = provider.download(
+            group, interval, start=since, auto_adjust=auto_adjust
+        )
+        for symbol in update.columns:
+            if not update[symbol].notna().any():
+                continue
+            if auto_adjust and cache.readjusted(
+                symbol, interval, update[symbol], auto_adjust
+            ):
+                # A split or dividend rescaled the history: refetch it in full
+                cache.drop(symbol, interval, auto_adjust)
+                stale.append(symbol)
+            else:
+                cache.merge(symbol, interval, update[symbol], auto_adjust)
+
+    if stale:
+        fresh = provider.download(stale, interval, period=period, auto_adjust=auto_adjust)
+        for symbol in fresh.columns:
+            if fresh[symbol].notna().any():
+                cache.merge(
+                    symbol, interval, fresh[symbol], auto_adjust, covered_from=start
+                )
+
+    series = [cache.load(symbol, interval, auto_adjust) for symbol in symbols]
+    series = [s for s in series if s is not None and not s.empty]
+    if not series:
+        return pd.DataFrame()
+    data = pd.concat(series, axis=1).sort_index()
+    if start is not None:
+        if data.index.tz is not None:
+            start = start.tz_localize(data.index.tz)
+        data = data[data.index >= start]
+    data = data.dropna(how="all")
+    data.index.name = "Date"
     return data
 
 
+def resample_prices(prices: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Resample daily closes to a coarser yfinance interval ("1wk", "1mo", "3mo").
+    Each bar is the last valid close in its calendar week/month/quarter, labelled with
+    the bucket's start date like yfinance bars. "1d" (or unknown intervals) pass through.
+    """
+    freq = RESAMPLE_FREQ.get(interval)
+    if freq is None or prices.empty:
+        return prices
+    buckets = prices.index.to_period(freq)
+    resampled = prices.groupby(buckets).last()
+    resampled.index = resampled.index.to_timestamp(how="start")
+    resampled.index.name = "Date"
+    return resampled
+
+
+def slice_period(prices: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Keep the trailing `period` of a price panel, measured back from its last bar."""
+    if prices.empty:
+        return prices
+    start = period_start(period, now=prices.index.max().normalize())
+    if start is None:
+        return prices
+    if prices.index.tz is not None:
+        start = start.tz_localize(prices.index.tz)
+    return prices[prices.index >= start]
+
+
+def longest_period(periods: List[str]) -> str:
+    """The period in `periods` covering the most history (per period_options order)."""
+    return max(
+        periods,
+        key=lambda p: period_options.index(p) if p in period_options else -1,
+    )
+
+
+def fetch_daily_prices(
+    symbols: List[str],
+    periods: List[str],
+    provider: Optional[PriceProvider] = None,
+) -> pd.DataFrame:
+    """
+    Fetch one daily panel long enough for every period in `periods`.
+    Pass the result to get_rrg_data(daily_prices=...) so each period is sliced and
+    resampled locally instead of being downloaded separately.
+    """
+    return fetch_prices(
+        symbols, period=longest_period(periods), interval="1d", provider=provider
+    )
+
+
+def prices_for_period(daily_prices: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Slice a daily panel to `period` and resample it to that period's interval."""
+    interval = interval_map.get(period, "1wk")
+    return resample_prices(slice_period(daily_prices, period), interval)
+
+
 def calculate_rs_ratio_and_momentum(
     prices: pd.DataFrame, benchmark: pd.Series, window: int = 10
 ):
     """
     Calculate RS-Ratio (RSR) and RS-Momentum (RSM) for each ticker relative to the benchmark.
+    Rolling windows run over each ticker's own valid observations, so a missing price
+    only removes that ticker's bar rather than the date for everyone.
+    All tickers are computed together on a (dates x tickers) array (see engine.rrg_arrays).
     Returns a DataFrame with columns: Symbol, Date, RS_Ratio, RS_Momentum
     """
-    results = []
-    for symbol in prices.columns:
-        if symbol == benchmark.name:
-            continue
-        # 1. Relative Strength (RS): ratio of ticker to benchmark
-        rs = 100 * (prices[symbol] / benchmark)
-        # 2. RS-Ratio (RSR): z-score of RS over rolling window, shifted/scaled to StockCharts convention
-        rs_mean = rs.rolling(window=window).mean()
-        rs_std = rs.rolling(window=window).std(ddof=0)
-        rsr = 100 + (rs - rs_mean) / rs_std
-        # 3. RS-Ratio ROC: percent change of RS-Ratio
-        rsr_roc = 100 * (rsr / rsr.shift(1) - 1)
-        # 4. RS-Momentum (RSM): z-score of RS-Ratio ROC over rolling window, shifted/scaled
-        rsm_mean = rsr_roc.rolling(window=window).mean()
-        rsm_std = rsr_roc.rolling(window=window).std(ddof=0)
-        rsm = 101 + (rsr_roc - rsm_mean) / rsm_std
-        # Align indices
-        valid_idx = rsr.index.intersection(rsm.index)
-        for date in valid_idx:
-            results.append(
-                {
-                    "Symbol": symbol,
-                    "Date": date,
-                    "RS_Ratio": rsr.loc[date],
-                    "RS_Momentum": rsm.loc[date],
-                }
-            )
-    return pd.DataFrame(results)
+    prices = prices.drop(columns=[benchmark.name], errors="ignore")
+    benchmark = benchmark.reindex(prices.index)
+    rsr, rsm, mask = rrg_arrays(
+        prices.to_numpy(dtype=float),
+        benchmark.to_numpy(dtype=float)[:, None],
+        window,
+    )
+    return rrg_long_frame(prices.index, prices.columns, rsr, rsm, mask)
+
+
+def calculate_rs_ratio_and_momentum_windows(
+    prices: pd.DataFrame, benchmark: pd.Series, windows: List[int]
+) -> RRGTensor:
+    """
+    RS-Ratio and RS-Momentum for every window in `windows` (e.g. a sensitivity sweep
+    over window_map values) from a single pass over the price panel.
+    Returns an RRGTensor shaped (window x symbol x date); tensor.frame(window) gives the
+    same long frame as calculate_rs_ratio_and_momentum(prices, benchmark, window).
+    """
+    prices = prices.drop(columns=[benchmark.name], errors="ignore")
+    benchmark = benchmark.reindex(prices.index)
+    rsr, rsm, mask = rrg_arrays_multi_window(
+        prices.to_numpy(dtype=float),
+        benchmark.to_numpy(dtype=float)[:, None],
+        windows,
+    )
+    return RRGTensor(
+        key_name="window",
+        keys=list(windows),
+        symbols=prices.columns,
+        dates=prices.index,
+        rs_ratio=rsr.transpose(0, 2, 1),
+        rs_momentum=rsm.transpose(0, 2, 1),
+        mask=np.broadcast_to(mask.T, (len(windows),) + mask.T.shape),
+    )
 
 
 def calculate_momentum_flip_count(df: pd.DataFrame) -> pd.DataFrame:
@@ -100,92 +230,180 @@ def calculate_momentum_flip_count(df: pd.DataFrame) -> pd.DataFrame:
     For each ticker, track the number of times RS-Momentum crosses 100 (up or down),
     resetting the count whenever RS-Ratio crosses 100 (changes half).
     Adds a new column 'Momentum_Flip_Count' to the DataFrame.
+    Computed for all tickers at once: rows are split into segments (a new ticker or a
+    change of half starts one) and crossings are counted with a segmented cumulative sum.
     """
     df = df.sort_values(["Symbol", "Date"]).copy()
-    df["Momentum_Flip_Count"] = 0
-    for symbol in df["Symbol"].unique():
-        mask = df["Symbol"] == symbol
-        sub = df.loc[mask]
-        last_half = None
-        last_momentum = None
-        flip_count = 0
-        counts = []
-        for _, row in sub.iterrows():
-            rsr = row["RS_Ratio"]
-            rsm = row["RS_Momentum"]
-            # Determine current half
-            current_half = "right" if rsr >= 100 else "left"
-            # Reset if half changes
-            if last_half is not None and current_half != last_half:
-                flip_count = 0
-                last_momentum = None
-            # Count momentum flips
-            if last_momentum is not None:
-                if (last_momentum < 100 and rsm >= 100) or (
-                    last_momentum >= 100 and rsm < 100
-                ):
-                    flip_count += 1
-            counts.append(flip_count)
-            last_half = current_half
-            last_momentum = rsm
-        df.loc[mask, "Momentum_Flip_Count"] = counts
+    n = len(df)
+    if n == 0:
+        df["Momentum_Flip_Count"] = 0
+        return df
+    symbols = df["Symbol"].to_numpy()
+    rsr = df["RS_Ratio"].to_numpy(dtype=float)
+    rsm = df["RS_Momentum"].to_numpy(dtype=float)
+
+    # Half: right of the 100 line (NaN counts as left, as in a scalar comparison)
+    right = rsr >= 100
+    segment_start = np.ones(n, dtype=bool)
+    segment_start[1:] = (symbols[1:] != symbols[:-1]) | (right[1:] != right[:-1])
+
+    # Momentum crossings between consecutive rows; NaN on either side is not a crossing
+    previous = np.concatenate([[np.nan], rsm[:-1]])
+    crossed = ((previous < 100) & (rsm >= 100)) | ((previous >= 100) & (rsm < 100))
+    flips = np.cumsum(crossed & ~segment_start)
+
+    # Subtract the running total at the start of each row's segment
+    start_idx = np.maximum.accumulate(np.where(segment_start, np.arange(n), 0))
+    df["Momentum_Flip_Count"] = flips - flips[start_idx]
     return df
 
 
-def get_rrg_data(tickers, benchmark, period):
+def calculate_rs_ratio_and_momentum_benchmarks(
+    prices: pd.DataFrame, benchmarks: pd.DataFrame, window: int = 10
+) -> RRGTensor:
     """
-    Fetch price data for tickers and benchmark. Return a DataFrame with columns:
-    ['Symbol', 'Date', 'Price', 'Benchmark', 'RS_Ratio', 'RS_Momentum', 'Momentum_Flip_Count']
+    RS-Ratio and RS-Momentum of every ticker against every benchmark column, computed
+    as one broadcast (dates x benchmarks x tickers) array operation, along with their
+    rolling volatilities over the same window.
+    Returns an RRGTensor shaped (benchmark x symbol x date); tensor.frame(benchmark)
+    matches calculate_rs_ratio_and_momentum against that benchmark alone.
+    """
+    benchmarks = benchmarks.reindex(prices.index)
+    rsr, rsm, mask, rsr_vol, rsm_vol = rrg_arrays(
+        prices.to_numpy(dtype=float)[:, None, :],
+        benchmarks.to_numpy(dtype=float)[:, :, None],
+        window,
+        volatility=True,
+    )
+    # A ticker is not measured against itself
+    mask = mask & (
+        benchmarks.columns.to_numpy()[:, None] != prices.columns.to_numpy()[None, :]
+    )
+    return RRGTensor(
+        key_name="benchmark",
+        keys=list(benchmarks.columns),
+        symbols=prices.columns,
+        dates=prices.index,
+        rs_ratio=rsr.transpose(1, 2, 0),
+        rs_momentum=rsm.transpose(1, 2, 0),
+        mask=mask.transpose(1, 2, 0),
+        rs_ratio_vol=rsr_vol.transpose(1, 2, 0),
+        rs_momentum_vol=rsm_vol.transpose(1, 2, 0),
+    )
+
+
+def get_rrg_panel(
+    tickers,
+    benchmark,
+    period,
+    provider: Optional[PriceProvider] = None,
+    daily_prices: Optional[pd.DataFrame] = None,
+    dtype=np.float64,
+):
+    """
+    Compute RRG data as an RRGPanel: shared date and symbol indexes with 2-D arrays
+    for price, RS-Ratio, RS-Momentum and flip count (`dtype` sets the float precision).
+    The panel also carries the rolling volatility of RS-Ratio and RS-Momentum, which
+    scales distance and flip count into the Distance_Norm / Flip_Count_Norm columns.
     Also returns a list of tickers that were dropped due to insufficient data.
+    Arguments are as for get_rrg_data; with a list of benchmarks, returns a dict of
+    panels keyed by benchmark.
     """
+    multi = isinstance(benchmark, (list, tuple))
+    benchmarks = list(dict.fromkeys(benchmark)) if multi else [benchmark]
+
+    def result(panels, dropped):
+        return (panels if multi else panels[benchmark]), dropped
+
+    empty = {b: RRGPanel.empty_panel(b, dtype) for b in benchmarks}
     if not tickers:
-        return pd.DataFrame(columns=RRG_DATA_COLUMNS + ["Momentum_Flip_Count"]), []
+        return result(empty, [])
 
-    interval = interval_map.get(period, "1wk")
     window = window_map.get(period, 50)
 
-    prices = fetch_prices(tickers + [benchmark], period=period, interval=interval)
-    if prices.empty:
-        return pd.DataFrame(columns=RRG_DATA_COLUMNS + ["Momentum_Flip_Count"]), tickers
+    symbols = list(dict.fromkeys(list(tickers) + benchmarks))
+    if daily_prices is None:
+        daily_prices = fetch_prices(
+            symbols, period=period, interval="1d", provider=provider
+        )
+    columns = [c for c in symbols if c in daily_prices.columns]
+    prices = prices_for_period(daily_prices[columns], period)
+    benchmarks_found = [
+        b for b in benchmarks if b in prices.columns and prices[b].notna().any()
+    ]
+    if prices.empty or not benchmarks_found:
+        return result(empty, tickers)
 
-    prices = prices.dropna()
-    if prices.empty:
-        return pd.DataFrame(columns=RRG_DATA_COLUMNS + ["Momentum_Flip_Count"]), tickers
+    # Keep dates where at least one benchmark trades; each benchmark's panel then
+    # aligns to its own calendar
+    prices = prices[prices[benchmarks_found].notna().any(axis=1)]
 
-    # Only keep tickers that are present in the prices DataFrame
-    available_tickers = [t for t in tickers if t in prices.columns]
-    dropped_tickers = [t for t in tickers if t not in prices.columns]
+    # Only keep tickers that have at least one price on a benchmark's calendar
+    available_tickers = [
+        t for t in tickers if t in prices.columns and prices[t].notna().any()
+    ]
+    dropped_tickers = [t for t in tickers if t not in available_tickers]
 
     if not available_tickers:
-        return pd.DataFrame(columns=RRG_DATA_COLUMNS + ["Momentum_Flip_Count"]), tickers
+        return result(empty, tickers)
 
-    df = (
-        prices[available_tickers]
-        .reset_index()
-        .melt(id_vars=["Date"], var_name="Symbol", value_name="Price")
-    )
-    # Add benchmark price for each date
-    benchmark_prices = prices[benchmark].reset_index()
-    df = df.merge(benchmark_prices, on="Date", how="left", suffixes=("", "_Benchmark"))
-    df = df.rename(columns={benchmark: "Benchmark"})
-
-    # Calculate RS-Ratio and RS-Momentum
-    rs_df = calculate_rs_ratio_and_momentum(
-        prices[available_tickers], prices[benchmark], window
+    # Calculate RS-Ratio and RS-Momentum against every benchmark at once
+    tensor = calculate_rs_ratio_and_momentum_benchmarks(
+        prices[available_tickers], prices[benchmarks_found], window
     )
-    if rs_df.empty:
-        df["RS_Ratio"] = np.nan
-        df["RS_Momentum"] = np.nan
-        df["Momentum_Flip_Count"] = 0
-        return df[RRG_DATA_COLUMNS + ["Momentum_Flip_Count"]], dropped_tickers
+    ticker_prices = prices[available_tickers].to_numpy(dtype=float)
+    panels = dict(empty)
+    for i, b in enumerate(benchmarks_found):
+        panels[b] = RRGPanel.from_arrays(
+            prices.index,
+            available_tickers,
+            b,
+            ticker_prices,
+            prices[b].to_numpy(dtype=float),
+            tensor.rs_ratio[i].T,
+            tensor.rs_momentum[i].T,
+            dtype,
+            rs_ratio_vol=tensor.rs_ratio_vol[i].T,
+            rs_momentum_vol=tensor.rs_momentum_vol[i].T,
+        )
+    return result(panels, dropped_tickers)
+
 
-    df = df.merge(rs_df, on=["Symbol", "Date"], how="left")
-    df = calculate_momentum_flip_count(df)
-    # TODO: add volatility metric to normalize flip count and distance
-    return df, dropped_tickers
+def get_rrg_data(
+    tickers,
+    benchmark,
+    period,
+    provider: Optional[PriceProvider] = None,
+    daily_prices: Optional[pd.DataFrame] = None,
+):
+    """
+    Fetch price data for tickers and benchmark. Return a DataFrame with columns:
+    ['Symbol', 'Date', 'Price', 'Benchmark', 'RS_Ratio', 'RS_Momentum', 'Momentum_Flip_Count',
+     'RS_Ratio_Vol', 'RS_Momentum_Vol', 'Distance_Norm', 'Flip_Count_Norm']
+    (see panel.PANEL_COLUMNS for the noise-band columns).
+    Also returns a list of tickers that were dropped due to insufficient data.
+    `provider` selects the price source (defaults to get_default_provider()).
+    Prices are fetched as daily bars and resampled to the period's interval; pass a
+    shared `daily_prices` panel (see fetch_daily_prices) to skip the fetch entirely.
+
+    `benchmark` may also be a list of benchmarks: every (ticker, benchmark) pair is then
+    computed in one broadcast pass and the first return value is a dict mapping each
+    benchmark to its DataFrame, so switching benchmarks is a lookup.
+
+    This is the long-format view of get_rrg_panel, which avoids building it.
+    """
+    panels, dropped = get_rrg_panel(
+        tickers, benchmark, period, provider=provider, daily_prices=daily_prices
+    )
+    if isinstance(panels, dict):
+        return {b: panel.to_long() for b, panel in panels.items()}, dropped
+    return panels.to_long(), dropped
 
 
 def get_latest_valid_points(df):
+    if isinstance(df, RRGPanel):
+        # Last-valid-index lookup per symbol column, no long frame needed
+        return df.latest_points()
     # Only keep rows with valid RS_Ratio and RS_Momentum
     valid = df.dropna(subset=["RS_Ratio", "RS_Momentum"])
     # For each symbol, get the row with the latest date
@@ -0,0 +1,175 @@
+# Compact wide-array RRG results: shared date/symbol indexes and one 2-D array per metric.
+# The long (Symbol, Date, ...) frame the UI consumes is only built when asked for.
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .engine import flip_count_array
+
+PANEL_COLUMNS = [
+    "Symbol",
+    "Date",
+    "Price",
+    "Benchmark",
+    "RS_Ratio",
+    "RS_Momentum",
+    "Momentum_Flip_Count",
+    # Noise band: rolling std of RS-Ratio / RS-Momentum over the RRG window, and the
+    # distance from (100, 100) and flip count scaled by it
+    "RS_Ratio_Vol",
+    "RS_Momentum_Vol",
+    "Distance_Norm",
+    "Flip_Count_Norm",
+]
+
+
+@dataclass
+class RRGPanel:
+    """
+    RRG results for one benchmark as (dates, symbols) arrays.
+    `mask` marks the cells where the symbol has a price on the benchmark's calendar;
+    everything outside it is NaN (or 0 for flip counts).
+    `rs_ratio_vol` / `rs_momentum_vol` are the rolling volatilities used to tell a
+    real move from noise (see distance_norm and flip_count_norm).
+    """
+
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    benchmark: str
+    price: np.ndarray
+    benchmark_price: np.ndarray
+    rs_ratio: np.ndarray
+    rs_momentum: np.ndarray
+    flip_count: np.ndarray
+    mask: np.ndarray
+    rs_ratio_vol: np.ndarray
+    rs_momentum_vol: np.ndarray
+    _long: Optional[pd.DataFrame] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        dates,
+        symbols,
+        benchmark,
+        price,
+        benchmark_price,
+        rs_ratio,
+        rs_momentum,
+        dtype=np.float64,
+        rs_ratio_vol=None,
+        rs_momentum_vol=None,
+    ) -> "RRGPanel":
+        """
+        Build a panel, restricted to the dates where the benchmark has a price.
+        Volatilities that are not given are left as NaN.
+        """
+        keep = np.isfinite(benchmark_price)
+        price = np.asarray(price, dtype=float)[keep]
+        mask = np.isfinite(price)
+        rs_ratio = np.where(mask, rs_ratio[keep], np.nan)
+        rs_momentum = np.where(mask, rs_momentum[keep], np.nan)
+        vols = [
+            (
+                np.full(price.shape, np.nan)
+                if vol is None
+                else np.where(mask, vol[keep], np.nan)
+            )
+            for vol in (rs_ratio_vol, rs_momentum_vol)
+        ]
+        return cls(
+            dates=pd.DatetimeIndex(dates[keep], name="Date"),
+            symbols=pd.Index(symbols, name="Symbol"),
+            benchmark=benchmark,
+            price=price.astype(dtype),
+            benchmark_price=np.asarray(benchmark_price, dtype=dtype)[keep],
+            rs_ratio=rs_ratio.astype(dtype),
+            rs_momentum=rs_momentum.astype(dtype),
+            flip_count=flip_count_array(rs_ratio, rs_momentum, mask).astype(np.int32),
+            mask=mask,
+            rs_ratio_vol=vols[0].astype(dtype),
+            rs_momentum_vol=vols[1].astype(dtype),
+        )
+
+    @classmethod
+    def empty_panel(cls, benchmark: str, dtype=np.float64) -> "RRGPanel":
+        none = np.empty((0, 0), dtype=dtype)
+        return cls.from_arrays(
+            pd.DatetimeIndex([]), [], benchmark, none, np.empty(0), none, none, dtype
+        )
+
+    @property
+    def empty(self) -> bool:
+        return not self.mask.any()
+
+    def to_long(self) -> pd.DataFrame:
+        """
+        Long-format frame with PANEL_COLUMNS (the get_rrg_data schema), one row per
+        valid cell, ordered by symbol then date. Built on first use and then reused.
+        """
+        if self._long is None:
+            self._long = self._long_frame(self.mask)
+        return self._long
+
+    def distance_norm(self) -> np.ndarray:
+        """Distance from (100, 100) in units of the combined RS-Ratio/RS-Momentum noise."""
+        distance = np.hypot(self.rs_ratio - 100, self.rs_momentum - 100)
+        return _scaled(distance, np.hypot(self.rs_ratio_vol, self.rs_momentum_vol))
+
+    def flip_count_norm(self) -> np.ndarray:
+        """Momentum flip count per unit of RS-Momentum volatility."""
+        return _scaled(self.flip_count, self.rs_momentum_vol)
+
+    def _long_frame(self, cells: np.ndarray) -> pd.DataFrame:
+        # Symbols in sorted order to match a groupby/sort_values on the long frame
+        sym_order = np.argsort(np.asarray(self.symbols, dtype=str), kind="stable")
+        sym_pos, date_idx = np.nonzero(cells[:, sym_order].T)
+        sym_idx = sym_order[sym_pos]
+        rsr = self.rs_ratio[date_idx, sym_idx]
+        rsm = self.rs_momentum[date_idx, sym_idx]
+        rsr_vol = self.rs_ratio_vol[date_idx, sym_idx]
+        rsm_vol = self.rs_momentum_vol[date_idx, sym_idx]
+        flips = self.flip_count[date_idx, sym_idx]
+        return pd.DataFrame(
+            {
+                "Symbol": np.asarray(self.symbols, dtype=object)[sym_idx],
+                "Date": self.dates[date_idx],
+                "Price": self.price[date_idx, sym_idx],
+                "Benchmark": self.benchmark_price[date_idx],
+                "RS_Ratio": rsr,
+                "RS_Momentum": rsm,
+                "Momentum_Flip_Count": flips,
+                "RS_Ratio_Vol": rsr_vol,
+                "RS_Momentum_Vol": rsm_vol,
+                "Distance_Norm": _scaled(
+                    np.hypot(rsr - 100, rsm - 100), np.hypot(rsr_vol, rsm_vol)
+                ),
+                "Flip_Count_Norm": _scaled(flips, rsm_vol),
+            },
+            columns=PANEL_COLUMNS,
+        )
+
+    def last_valid_index(self) -> np.ndarray:
+        """Row of each symbol's latest point with both RS-Ratio and RS-Momentum (-1 if none)."""
+        valid = np.isfinite(self.rs_ratio) & np.isfinite(self.rs_momentum)
+        if len(self.dates) == 0:
+            return np.full(len(self.symbols), -1)
+        last = len(self.dates) - 1 - np.argmax(valid[::-1], axis=0)
+        return np.where(valid.any(axis=0), last, -1)
+
+    def latest_points(self) -> pd.DataFrame:
+        """Latest valid row per symbol, like get_latest_valid_points on the long frame."""
+        last = self.last_valid_index()
+        cells = np.zeros(self.mask.shape, dtype=bool)
+        has_point = np.flatnonzero(last >= 0)
+        cells[last[has_point], has_point] = True
+        return self._long_frame(cells)
+
+
+def _scaled(values: np.ndarray, noise: np.ndarray) -> np.ndarray:
+    """values / noise, NaN where the noise is zero or unknown."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(noise > 0, values / noise, np.nan)
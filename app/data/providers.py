@@ -0,0 +1,302 @@
+# Price providers: where fetch_prices gets its bars from.
+# yfinance is the default; the file and synthetic providers let the pipeline run without network.
+
+import logging
+import os
+from abc import ABC, abstractmethod
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Bar frequency (pandas alias) and bars per year for each yfinance interval
+INTERVAL_FREQ = {
+    "1d": "B",
+    "1wk": "W-MON",
+    "1mo": "MS",
+    "3mo": "QS",
+}
+BARS_PER_YEAR = {
+    "1d": 252,
+    "1wk": 52,
+    "1mo": 12,
+    "3mo": 4,
+}
+
+# Calendar offsets for yfinance period strings, used to slice cached history
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Substrings of throttling errors, e.g. yfinance's YFRateLimitError or an HTTP 429
+RATE_LIMIT_MARKERS = ("ratelimit", "rate limit", "too many requests", "throttl", "429")
+# Substrings of network failures as yfinance reports them (requests / curl errors)
+NETWORK_MARKERS = ("connectionerror", "timed out", "timeout", "could not resolve")
+
+
+def is_transient_message(text: str) -> bool:
+    """True if an error message points at rate limiting or the network."""
+    text = text.lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS + NETWORK_MARKERS)
+
+
+class TransientDownloadError(ConnectionError):
+    """A download failed because of rate limiting or the network; retry it later."""
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None):
+    """
+    First timestamp covered by a yfinance period string, or None for "max".
+    """
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        raise ValueError(f"Unsupported period: {period}")
+    return now - offset
+
+
+class PriceProvider(ABC):
+    """
+    Base class for price sources. Subclasses implement download(), returning close
+    prices as a DataFrame with columns as symbols and a DatetimeIndex named "Date".
+    Either `period` (a yfinance period string) or `start` (a timestamp) is given.
+    A subclass without download() cannot be instantiated.
+    """
+
+    name = "base"
+    # Only remote providers benefit from the on-disk PriceCache
+    cacheable = False
+
+    @abstractmethod
+    def download(
+        self,
+        symbols: List[str],
+        interval: str,
+        period: Optional[str] = None,
+        start=None,
+        auto_adjust: bool = True,
+    ) -> pd.DataFrame:
+        """Close prices for `symbols` at `interval`."""
+
+
+class _ThreadErrors(logging.Handler):
+    """Collects the error records logged by one thread."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.messages: List[str] = []
+
+    def emit(self, record):
+        if record.thread == self.thread:
+            self.messages.append(record.getMessage())
+
+
+@contextmanager
+def yfinance_errors():
+    """
+    The failures yf.download logs from the calling thread. yfinance catches every
+    per-ticker exception (rate limits included) and only logs it, returning empty
+    columns instead.
+    """
+    handler = _ThreadErrors()
+    logger = logging.getLogger("yfinance")
+    logger.addHandler(handler)
+    try:
+        yield handler.messages
+    finally:
+        logger.removeHandler(handler)
+
+
+class YFinanceProvider(PriceProvider):
+    """
+    Close prices from yf.download. Symbols that come back empty because of rate
+    limiting or the network raise TransientDownloadError, so the ChunkedDownloader
+    can back off and retry them; other misses are just absent from the frame.
+    """
+
+    name = "yfinance"
+    cacheable = True
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        kwargs = {"start": start} if start is not None else {"period": period}
+        with yfinance_errors() as errors:
+            data = yf.download(
+                symbols,
+                interval=interval,
+                auto_adjust=auto_adjust,
+                progress=False,
+                **kwargs,
+            )
+        data = self._closes(data, symbols)
+        missing = [s for s in symbols if s not in data or data[s].isna().all()]
+        transient = [message for message in errors if is_transient_message(message)]
+        if missing and transient:
+            raise TransientDownloadError(
+                f"{len(missing)} of {len(symbols)} symbols failed: {transient[0]}"
+            )
+        return data
+
+    @staticmethod
+    def _closes(data, symbols) -> pd.DataFrame:
+        """The close column of every symbol in a yf.download frame."""
+        if data is None or data.empty:
+            return pd.DataFrame()
+
+        # Always get 'Close' (already adjusted if auto_adjust=True)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Select only the 'Close' price for all tickers
+            data = data["Close"]
+            # If only one ticker, data is a Series; convert to DataFrame
+            if isinstance(data, pd.Series):
+                data = data.to_frame(name=symbols[0])
+            else:
+                # Ensure columns are just ticker symbols
+                data.columns = [str(col) for col in data.columns]
+        else:
+            # Single ticker, single-level columns
+            data = data[["Close"]]
+            data.columns = [symbols[0]]
+        data.index.name = "Date"
+        return data
+
+
+class FileProvider(PriceProvider):
+    """
+    Reads one file per symbol from a directory, e.g. recorded sessions or an offline mirror.
+    Looks for <root>/<interval>/<SYMBOL>.parquet|.csv first, then <root>/<SYMBOL>.parquet|.csv.
+    Files need a date index (or "Date" column) and a "Close" column; a single-column
+    file is taken as the close series.
+    """
+
+    name = "file"
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _find(self, symbol: str, interval: str) -> Optional[Path]:
+        for folder in (self.root / interval, self.root):
+            for suffix in (".parquet", ".csv"):
+                path = folder / f"{symbol}{suffix}"
+                if path.exists():
+                    return path
+        return None
+
+    def _read(self, path: Path) -> pd.Series:
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path)
+        if "Date" in frame.columns:
+            frame = frame.set_index("Date")
+        frame.index = pd.to_datetime(frame.index)
+        if "Close" in frame.columns:
+            return frame["Close"]
+        return frame.iloc[:, 0]
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        columns = {}
+        for symbol in symbols:
+            path = self._find(symbol, interval)
+            if path is not None:
+                columns[symbol] = self._read(path)
+        if not columns:
+            return pd.DataFrame()
+        data = pd.DataFrame(columns).sort_index()
+        if start is None and period is not None:
+            start = period_start(period, now=data.index.max())
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        data.index.name = "Date"
+        return data
+
+
+class SyntheticProvider(PriceProvider):
+    """
+    Geometric Brownian motion prices for benchmarking and tests.
+    Each symbol gets its own reproducible path (seeded from `seed` and the symbol name),
+    so the same symbol always produces the same prices regardless of which other
+    symbols are requested alongside it.
+    """
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        seed: int = 0,
+        mu: float = 0.07,
+        sigma: float = 0.25,
+        start_price: float = 100.0,
+        end=None,
+        max_years: int = 20,
+    ):
+        self.seed = seed
+        self.mu = mu
+        self.sigma = sigma
+        self.start_price = start_price
+        self.end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end)
+        self.max_years = max_years
+
+    def _dates(self, interval: str) -> pd.DatetimeIndex:
+        freq = INTERVAL_FREQ.get(interval, "B")
+        first = self.end - pd.DateOffset(years=self.max_years)
+        return pd.date_range(first, self.end, freq=freq, name="Date")
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        dates = self._dates(interval)
+        dt = 1.0 / BARS_PER_YEAR.get(interval, 252)
+        paths = {}
+        for symbol in symbols:
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            shocks = rng.standard_normal(len(dates))
+            log_returns = (self.mu - 0.5 * self.sigma**2) * dt + self.sigma * np.sqrt(
+                dt
+            ) * shocks
+            paths[symbol] = self.start_price * np.exp(np.cumsum(log_returns))
+        data = pd.DataFrame(paths, index=dates)
+        if start is None and period is not None:
+            start = period_start(period, now=self.end)
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        return data
+
+
+def provider_from_spec(spec: Optional[str]) -> PriceProvider:
+    """
+    Build a provider from a short string: "yfinance", "synthetic", "synthetic:<seed>",
+    or "file:<directory>". yfinance requests go through the ChunkedDownloader so large
+    universes are split, rate limited and retried.
+    """
+    # Imported here because downloader builds on PriceProvider from this module
+    from .downloader import ChunkedDownloader
+
+    if not spec or spec == "yfinance":
+        return ChunkedDownloader(YFinanceProvider())
+    kind, _, arg = spec.partition(":")
+    if kind == "synthetic":
+        return SyntheticProvider(seed=int(arg) if arg else 0)
+    if kind == "file":
+        return FileProvider(arg)
+    raise ValueError(f"Unknown price provider: {spec}")
+
+
+def get_default_provider() -> PriceProvider:
+    """Default provider, selectable with the RRGPY_PROVIDER environment variable."""
+    return provider_from_spec(os.environ.get("RRGPY_PROVIDER"))
@@ -0,0 +1,144 @@
+# Cross-sectional screens over the latest RRG point of every symbol.
+# Ranks with partial selection (argpartition) per quadrant, so a 5,000-symbol scan
+# only ever sorts the k rows it returns.
+
+from typing import Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from components.rrg_table import QUADRANT_ORDER as QUADRANTS
+from components.rrg_table import classify_quadrants
+
+from .panel import RRGPanel
+
+SCREEN_METRICS = ["Distance", "Heading", "Velocity"]
+
+
+def _previous_valid_index(valid: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """Row of each column's last valid cell strictly before `last` (-1 if none)."""
+    if len(valid) == 0:
+        return np.full(valid.shape[1], -1)
+    rows = np.arange(len(valid))[:, None]
+    before = valid & (rows < last[None, :])
+    prev = len(valid) - 1 - np.argmax(before[::-1], axis=0)
+    return np.where(before.any(axis=0), prev, -1)
+
+
+def latest_arrays(data) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Symbols plus (symbols, 2) arrays of each symbol's latest RS-Ratio / RS-Momentum
+    and of the point before it (NaN if there is none), from an RRGPanel or the long
+    get_rrg_data frame. Symbols without a valid point are left out.
+    """
+    if isinstance(data, RRGPanel):
+        coords = np.stack([data.rs_ratio, data.rs_momentum], axis=-1)
+        valid = np.isfinite(coords).all(axis=-1)
+        last = data.last_valid_index()
+        prev = _previous_valid_index(valid, last)
+        has_point = np.flatnonzero(last >= 0)
+        last, prev = last[has_point], prev[has_point]
+        latest = coords[last, has_point]
+        previous = np.where(
+            (prev >= 0)[:, None], coords[np.maximum(prev, 0), has_point], np.nan
+        )
+        return np.asarray(data.symbols, dtype=object)[has_point], latest, previous
+
+    valid = data.dropna(subset=["RS_Ratio", "RS_Momentum"]).sort_values(
+        ["Symbol", "Date"], kind="stable"
+    )
+    symbols = valid["Symbol"].to_numpy(dtype=object)
+    coords = valid[["RS_Ratio", "RS_Momentum"]].to_numpy(dtype=float)
+    # The last row of each symbol's run is its latest point
+    is_last = np.ones(len(symbols), dtype=bool)
+    is_last[:-1] = symbols[1:] != symbols[:-1]
+    last = np.flatnonzero(is_last)
+    has_prev = (last > 0) & (symbols[np.maximum(last - 1, 0)] == symbols[last])
+    previous = np.where(has_prev[:, None], coords[np.maximum(last - 1, 0)], np.nan)
+    return symbols[last], coords[last], previous
+
+
+def screen_metrics(latest: np.ndarray, previous: np.ndarray) -> dict:
+    """
+    Per-symbol arrays: Distance from (100, 100), Heading of the last step in degrees
+    (counter-clockwise from the RS-Ratio axis, 0-360) and Velocity (its length).
+    """
+    step = latest - previous
+    return {
+        "RS_Ratio": latest[:, 0],
+        "RS_Momentum": latest[:, 1],
+        "Distance": np.hypot(latest[:, 0] - 100, latest[:, 1] - 100),
+        "Heading": np.degrees(np.arctan2(step[:, 1], step[:, 0])) % 360,
+        "Velocity": np.hypot(step[:, 0], step[:, 1]),
+    }
+
+
+def top_k_per_group(
+    scores: np.ndarray, groups: np.ndarray, k: int, n_groups: int
+) -> np.ndarray:
+    """
+    Indices of the k highest finite scores within each group code 0..n_groups-1,
+    ordered by group and then by descending score. Only the selected rows are sorted.
+    """
+    selected = []
+    for group in range(n_groups):
+        idx = np.flatnonzero((groups == group) & np.isfinite(scores))
+        if len(idx) > k:
+            idx = idx[np.argpartition(-scores[idx], k - 1)[:k]]
+        selected.append(idx[np.argsort(-scores[idx], kind="stable")])
+    return np.concatenate(selected) if selected else np.empty(0, dtype=int)
+
+
+def screen_rrg(
+    data,
+    by: str = "Distance",
+    k: int = 50,
+    quadrants: Optional[Iterable[str]] = None,
+    filters: Optional[Mapping[str, Tuple[Optional[float], Optional[float]]]] = None,
+    target_heading: float = 45.0,
+) -> pd.DataFrame:
+    """
+    Top `k` symbols per quadrant by Distance, Velocity or Heading.
+    `data` is an RRGPanel or the long get_rrg_data frame; only each symbol's latest
+    valid point (and the step into it) is used.
+    `filters` maps a metric (RS_Ratio, RS_Momentum or one of SCREEN_METRICS) to an
+    inclusive (low, high) range; either bound may be None.
+    Ranking by "Heading" favours steps pointing closest to `target_heading` degrees
+    (45 is straight towards Leading).
+    Returns Symbol, Quadrant, RS_Ratio, RS_Momentum, Distance, Heading, Velocity and
+    Rank (1 = best within its quadrant), in QUADRANTS order.
+    """
+    if by not in SCREEN_METRICS:
+        raise ValueError(f"Unknown screen metric: {by}")
+    symbols, latest, previous = latest_arrays(data)
+    metrics = screen_metrics(latest, previous)
+    codes = classify_quadrants(metrics["RS_Ratio"], metrics["RS_Momentum"])
+
+    keep = np.ones(len(symbols), dtype=bool)
+    if quadrants is not None:
+        keep &= np.isin(codes, [QUADRANTS.index(q) for q in quadrants])
+    for name, (low, high) in (filters or {}).items():
+        if name not in metrics:
+            raise ValueError(f"Unknown screen filter: {name}")
+        if low is not None:
+            keep &= metrics[name] >= low
+        if high is not None:
+            keep &= metrics[name] <= high
+
+    if by == "Heading":
+        off_target = np.abs((metrics["Heading"] - target_heading + 180) % 360 - 180)
+        scores = -off_target
+    else:
+        scores = metrics[by]
+    picked = top_k_per_group(np.where(keep, scores, np.nan), codes, k, len(QUADRANTS))
+
+    picked_codes = codes[picked]
+    # Rank within each quadrant: position minus the start of that quadrant's block
+    block_start = np.searchsorted(picked_codes, picked_codes, side="left")
+    return pd.DataFrame(
+        {
+            "Symbol": symbols[picked],
+            "Quadrant": np.asarray(QUADRANTS, dtype=object)[picked_codes],
+            **{name: values[picked] for name, values in metrics.items()},
+            "Rank": np.arange(len(picked)) - block_start + 1,
+        }
+    )
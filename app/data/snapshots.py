@@ -0,0 +1,120 @@
+# Precomputed (date, symbol, 2) RRG coordinates for date scrubbing and animation.
+# Moving to another bar is an integer lookup plus a slice, with no pandas filtering.
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .panel import RRGPanel
+
+
+class SnapshotCube:
+    """
+    RS-Ratio / RS-Momentum for every (date, symbol) as one (dates, symbols, 2) array,
+    with coords[..., 0] the RS-Ratio and coords[..., 1] the RS-Momentum (NaN where a
+    symbol has no point). Tails are views into that array, never copies.
+    """
+
+    def __init__(self, dates, symbols, coords: np.ndarray):
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.symbols = pd.Index(symbols, name="Symbol")
+        self.coords = coords
+        if coords.shape != (len(self.dates), len(self.symbols), 2):
+            raise ValueError(
+                f"coords shape {coords.shape} does not match "
+                f"({len(self.dates)}, {len(self.symbols)}, 2)"
+            )
+
+    @classmethod
+    def from_panel(cls, panel: RRGPanel) -> "SnapshotCube":
+        coords = np.stack([panel.rs_ratio, panel.rs_momentum], axis=-1)
+        return cls(panel.dates, panel.symbols, coords)
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame) -> "SnapshotCube":
+        """Build from the long get_rrg_data frame."""
+        wide = df.pivot(
+            index="Date", columns="Symbol", values=["RS_Ratio", "RS_Momentum"]
+        )
+        wide = wide.sort_index()
+        symbols = wide["RS_Ratio"].columns
+        coords = np.stack(
+            [
+                wide["RS_Ratio"].to_numpy(dtype=float),
+                wide["RS_Momentum"][symbols].to_numpy(dtype=float),
+            ],
+            axis=-1,
+        )
+        return cls(wide.index, symbols, coords)
+
+    @classmethod
+    def from_series(
+        cls,
+        rs_ratio: Sequence[pd.Series],
+        rs_momentum: Sequence[pd.Series],
+        symbols: Sequence[str],
+    ) -> "SnapshotCube":
+        """Build from one RS-Ratio and one RS-Momentum series per symbol."""
+        rsr = pd.concat(list(rs_ratio), axis=1, keys=list(symbols)).sort_index()
+        rsm = pd.concat(list(rs_momentum), axis=1, keys=list(symbols))
+        rsm = rsm.reindex(rsr.index)
+        coords = np.stack(
+            [rsr.to_numpy(dtype=float), rsm.to_numpy(dtype=float)], axis=-1
+        )
+        return cls(rsr.index, symbols, coords)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def valid_dates(self) -> pd.DatetimeIndex:
+        """Dates on which at least one symbol has a point (no warm-up bars)."""
+        return self.dates[np.isfinite(self.coords).all(axis=-1).any(axis=1)]
+
+    def position(self, date) -> int:
+        """Row of the last bar at or before `date` (-1 if it precedes every bar)."""
+        return int(self.dates.searchsorted(pd.Timestamp(date), side="right")) - 1
+
+    def at(self, t: int) -> np.ndarray:
+        """(symbols, 2) view of the coordinates on bar `t`."""
+        return self.coords[t]
+
+    def tail(self, t: int, length: int) -> np.ndarray:
+        """
+        (<= length, symbols, 2) view of the bars ending at bar `t`. A negative `t`
+        (position() before every bar) gives an empty tail, never the last bars.
+        """
+        return self.coords[max(t - length + 1, 0) : max(t + 1, 0)]
+
+    def tails(self, length: int) -> np.ndarray:
+        """
+        Every full-length tail at once as a (dates - length + 1, length, symbols, 2)
+        strided view: tails(length)[i] is tail(i + length - 1, length).
+        """
+        windows = sliding_window_view(self.coords, length, axis=0)
+        return np.moveaxis(windows, -1, 1)
+
+    def tail_frame(self, t: int, length: int) -> pd.DataFrame:
+        """
+        Long (Symbol, Date, RS_Ratio, RS_Momentum) frame of tail(t, length), empty
+        for a negative `t`.
+        """
+        start = max(t - length + 1, 0)
+        window = self.tail(t, length)
+        valid = np.isfinite(window).all(axis=-1)
+        sym_idx, date_idx = np.nonzero(valid.T)
+        return pd.DataFrame(
+            {
+                "Symbol": np.asarray(self.symbols, dtype=object)[sym_idx],
+                "Date": self.dates[start + date_idx],
+                "RS_Ratio": window[date_idx, sym_idx, 0],
+                "RS_Momentum": window[date_idx, sym_idx, 1],
+            }
+        )
+
+    def latest_frame(self, t: int, length: int) -> pd.DataFrame:
+        """Last valid point of each symbol within the tail ending at bar `t`."""
+        tail = self.tail_frame(t, length)
+        # Rows are ordered by symbol then date, so the last row per symbol is the latest
+        return tail[~tail["Symbol"].duplicated(keep="last")].reset_index(drop=True)
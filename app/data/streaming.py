@@ -0,0 +1,145 @@
+# Incremental RRG updates: one new bar costs O(1) per symbol instead of a full recompute.
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class _RollingWindow:
+    """
+    Ring buffers of the last `window` values for many symbols at once, with running
+    sums of value and squared value. Values are stored relative to a per-symbol
+    reference (the first value seen) so the running variance does not lose precision.
+    The sums are rebuilt from the buffer every `window` updates to stop rounding drift.
+    """
+
+    def __init__(self, n_symbols: int, window: int):
+        self.window = window
+        self.buffer = np.zeros((window, n_symbols))
+        self.count = np.zeros(n_symbols, dtype=int)
+        self.pos = np.zeros(n_symbols, dtype=int)
+        self.ref = np.full(n_symbols, np.nan)
+        self.s1 = np.zeros(n_symbols)
+        self.s2 = np.zeros(n_symbols)
+        self._updates = 0
+
+    def push(self, values: np.ndarray, active: np.ndarray):
+        """Add one value for each active symbol, evicting its oldest value when full."""
+        idx = np.flatnonzero(active)
+        first = np.isnan(self.ref[idx])
+        self.ref[idx[first]] = values[idx[first]]
+        x = values[idx] - self.ref[idx]
+        old = np.where(self.count[idx] >= self.window, self.buffer[self.pos[idx], idx], 0.0)
+        self.s1[idx] += x - old
+        self.s2[idx] += x * x - old * old
+        self.buffer[self.pos[idx], idx] = x
+        self.pos[idx] = (self.pos[idx] + 1) % self.window
+        self.count[idx] += 1
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self.resync()
+
+    def reset(self, active: np.ndarray):
+        """Empty the window for the given symbols (e.g. after a gap in their valid history)."""
+        self.count[active] = 0
+        self.pos[active] = 0
+        self.s1[active] = 0.0
+        self.s2[active] = 0.0
+        self.buffer[:, active] = 0.0
+
+    def resync(self):
+        filled = np.minimum(self.count, self.window)
+        rows = np.arange(self.window)[:, None] < filled[None, :]
+        values = np.where(rows, self.buffer, 0.0)
+        self.s1 = values.sum(axis=0)
+        self.s2 = (values * values).sum(axis=0)
+
+    def zscore(self, values: np.ndarray) -> np.ndarray:
+        """Z-score of `values` against the current window; NaN until the window is full."""
+        full = self.count >= self.window
+        mean = self.s1 / self.window
+        var = np.maximum(self.s2 / self.window - mean * mean, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (values - self.ref - mean) / np.sqrt(var)
+        return np.where(full, z, np.nan)
+
+
+class RRGState:
+    """
+    Streaming RS-Ratio / RS-Momentum for a watchlist.
+    Keeps per-symbol rolling accumulators for the RS and RS-Ratio ROC z-scores, so
+    update(bar) returns the new RS-Ratio and RS-Momentum for every symbol in constant
+    time per symbol. Results match calculate_rs_ratio_and_momentum on the same bars.
+    """
+
+    def __init__(self, symbols: Sequence[str], benchmark: str, window: int = 10):
+        self.symbols = list(symbols)
+        self.benchmark = benchmark
+        self.window = window
+        self._column = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self._rs = _RollingWindow(n, window)
+        self._roc = _RollingWindow(n, window)
+        self._prev_rsr = np.full(n, np.nan)
+        self.rs_ratio = np.full(n, np.nan)
+        self.rs_momentum = np.full(n, np.nan)
+        self.last_date = None
+
+    @classmethod
+    def from_prices(
+        cls, prices: pd.DataFrame, benchmark: str, window: int = 10
+    ) -> "RRGState":
+        """Warm up a state from a price history (columns are symbols plus the benchmark)."""
+        symbols = [c for c in prices.columns if c != benchmark]
+        state = cls(symbols, benchmark, window)
+        values = prices[symbols].to_numpy(dtype=float)
+        bench = prices[benchmark].to_numpy(dtype=float)
+        for date, row, bench_price in zip(prices.index, values, bench):
+            state.update_arrays(row, bench_price, date)
+        return state
+
+    def update(self, bar: Mapping[str, float], date=None):
+        """
+        Add one bar, given as {symbol: close, ..., benchmark: close}. Symbols missing
+        from the bar (or NaN) keep their state unchanged, like a gap in their history.
+        Returns a DataFrame indexed by symbol with RS_Ratio and RS_Momentum.
+        """
+        row = np.full(len(self.symbols), np.nan)
+        for symbol, price in bar.items():
+            if symbol in self._column:
+                row[self._column[symbol]] = price
+        self.update_arrays(row, bar.get(self.benchmark, np.nan), date)
+        return self.latest()
+
+    def update_arrays(self, prices: np.ndarray, benchmark_price: float, date=None):
+        """Array form of update(): `prices` is aligned with self.symbols."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = 100 * (np.asarray(prices, dtype=float) / benchmark_price)
+        active = np.isfinite(rs)
+        if not active.any():
+            return self.rs_ratio, self.rs_momentum
+
+        self._rs.push(rs, active)
+        rsr = 100 + self._rs.zscore(rs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roc = 100 * (rsr / self._prev_rsr - 1)
+
+        # The ROC window only accepts consecutive finite values, like pandas' rolling
+        roc_ok = active & np.isfinite(roc)
+        self._roc.reset(active & ~roc_ok)
+        self._roc.push(roc, roc_ok)
+        rsm = 101 + self._roc.zscore(roc)
+
+        self._prev_rsr[active] = rsr[active]
+        self.rs_ratio[active] = rsr[active]
+        self.rs_momentum[active] = np.where(roc_ok, rsm, np.nan)[active]
+        self.last_date = date if date is not None else self.last_date
+        return self.rs_ratio, self.rs_momentum
+
+    def latest(self, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        frame = pd.DataFrame(
+            {"RS_Ratio": self.rs_ratio, "RS_Momentum": self.rs_momentum},
+            index=pd.Index(self.symbols, name="Symbol"),
+        )
+        return frame if symbols is None else frame.loc[list(symbols)]
@@ -0,0 +1,77 @@
+# Shared daily price panel for every ticker group, so switching groups never re-downloads.
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .finance import fetch_daily_prices, period_options
+from .providers import PriceProvider
+
+
+class PriceUniverse:
+    """
+    Daily close panel for the deduplicated union of several ticker groups (plus any
+    benchmarks), fetched in one batched request.
+    Group panels are column selections of the shared frame (lazy copies under pandas
+    copy-on-write), so switching groups never touches the network.
+    One instance is shared by every app session (st.cache_resource), so ensure()
+    extends it under a lock.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[str, List[str]],
+        benchmarks: Iterable[str] = (),
+        periods: Optional[List[str]] = None,
+        provider: Optional[PriceProvider] = None,
+    ):
+        self.groups = {name: list(tickers) for name, tickers in groups.items()}
+        self.periods = list(periods) if periods else list(period_options)
+        self.provider = provider
+        # dict.fromkeys keeps first-seen order while dropping duplicates across groups
+        self.symbols = list(
+            dict.fromkeys(
+                [t for tickers in self.groups.values() for t in tickers]
+                + list(benchmarks)
+            )
+        )
+        self.panel = pd.DataFrame()
+        self.failed: List[str] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> "PriceUniverse":
+        self.panel = fetch_daily_prices(self.symbols, self.periods, self.provider)
+        self.failed = [s for s in self.symbols if s not in self.panel.columns]
+        return self
+
+    def ensure(self, symbols: Iterable[str]) -> "PriceUniverse":
+        """
+        Fetch symbols not yet in the universe (e.g. a custom benchmark) and add them.
+        The check and the extension run under one lock: concurrent sessions asking
+        for the same symbol download it once, and never overwrite each other's join.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        with self._lock:
+            missing = [s for s in symbols if s and s not in self.panel.columns]
+            if not missing:
+                return self
+            extra = fetch_daily_prices(missing, self.periods, self.provider)
+            panel = self.panel
+            if not extra.empty:
+                panel = extra if panel.empty else panel.join(extra, how="outer")
+                panel.index.name = "Date"
+            # Rebind rather than mutate, so readers always see a complete panel
+            self.symbols = self.symbols + [s for s in missing if s not in self.symbols]
+            self.failed = [s for s in self.symbols if s not in panel.columns]
+            self.panel = panel
+        return self
+
+    def prices(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """Columns of the shared panel for `symbols`; symbols without data are skipped."""
+        return self.panel[[s for s in dict.fromkeys(symbols) if s in self.panel.columns]]
+
+    def group(self, name: str, benchmark: Optional[str] = None) -> pd.DataFrame:
+        """Panel for one group, with the benchmark column appended when given."""
+        symbols = self.groups[name] + ([benchmark] if benchmark else [])
+        return self.prices(symbols)
@@ -1,14 +1,15 @@
 # this file will take a list of results from the get_rrg_data function and calculate velocity and volatility
 # i.e. is the magnitude of the velocity beyond a certain level of noise in either direction?
 
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
 from components.quadrant_colors import (
     QUADRANT_COLORS,
+    quadrant_color_array,
 )
-from components.rrg_table import assign_quadrant
+from components.rrg_table import classify_quadrants
 from palettable.colorbrewer.diverging import RdBu_11
 
 
@@ -21,163 +22,179 @@ def compare_rrg_timeframes(
 ) -> pd.DataFrame:
     """
     For each symbol, compute the difference in selected columns between df2 (later) and df1 (earlier).
-    Returns a DataFrame with columns: Symbol, <col>_Diff for each selected column and their perpendicular components.
+    Returns a DataFrame with columns: Symbol, <col>_Diff, <col>_HTF and <col>_LTF for each
+    selected column, the unit perpendicular of the move (Perp_RS_Ratio, Perp_RS_Momentum),
+    and its Heading, Angular_Rate and Speed (see below). All columns except Symbol are floats.
+    - Heading: direction of the LTF -> HTF move in degrees, counter-clockwise from the
+      RS-Ratio axis, in [0, 360). NaN when the point did not move.
+    - Angular_Rate: change in angle around (100, 100) from LTF to HTF in degrees, in
+      (-180, 180]. Positive is counter-clockwise, negative is the usual clockwise rotation.
+    - Speed: length of the move.
+    - Speed_Norm: Speed over the HTF RS-Ratio/RS-Momentum noise band (only when the
+      frames have the RS_Ratio_Vol / RS_Momentum_Vol columns); above 1 is beyond noise.
     """
-
-    # Get latest valid point per symbol for each df
-    def get_latest(df):
-        valid = df.dropna(subset=["RS_Ratio", "RS_Momentum"])
-        idx = valid.groupby("Symbol")["Date"].idxmax()
-        return valid.loc[idx].set_index("Symbol")
-
-    latest1 = get_latest(df1)
-    latest2 = get_latest(df2)
+    latest1 = _latest_points(df1)
+    latest2 = _latest_points(df2)
 
     # Only compare symbols present in both
     common_symbols = latest1.index.intersection(latest2.index)
     latest1 = latest1.loc[common_symbols]
     latest2 = latest2.loc[common_symbols]
 
-    # Compute differences for each symbol
-    diff_data = []
-    for symbol in common_symbols:
-        row = {"Symbol": symbol}
-        for col in columns:
-            row[f"{col}_Diff"] = latest2.loc[symbol, col] - latest1.loc[symbol, col]
-            row[f"{col}_HTF"] = latest2.loc[symbol, col]
-            row[f"{col}_LTF"] = latest1.loc[symbol, col]
+    out = {"Symbol": common_symbols.to_numpy(dtype=object)}
+    for col in columns:
+        htf = latest2[col].to_numpy(dtype=float)
+        ltf = latest1[col].to_numpy(dtype=float)
+        out[f"{col}_Diff"] = htf - ltf
+        out[f"{col}_HTF"] = htf
+        out[f"{col}_LTF"] = ltf
+
+    rs_ratio_diff = out["RS_Ratio_Diff"]
+    rs_momentum_diff = out["RS_Momentum_Diff"]
+
+    # Calculate the magnitude of the velocity vector
+    speed = np.hypot(rs_ratio_diff, rs_momentum_diff)
+    moved = speed > 0
+
+    # Calculate the perpendicular vector components (zero for a point that did not move)
+    safe_speed = np.where(moved, speed, 1.0)
+    out["Perp_RS_Ratio"] = np.where(moved, -rs_momentum_diff / safe_speed, 0.0)
+    out["Perp_RS_Momentum"] = np.where(moved, rs_ratio_diff / safe_speed, 0.0)
+
+    heading = np.degrees(np.arctan2(rs_momentum_diff, rs_ratio_diff)) % 360
+    out["Heading"] = np.where(moved, heading, np.nan)
+
+    # Angle of each point around the RRG centre, and the signed turn between them
+    angle_ltf = np.arctan2(out["RS_Momentum_LTF"] - 100, out["RS_Ratio_LTF"] - 100)
+    angle_htf = np.arctan2(out["RS_Momentum_HTF"] - 100, out["RS_Ratio_HTF"] - 100)
+    turn = np.degrees(angle_htf - angle_ltf)
+    out["Angular_Rate"] = 180 - (180 - turn) % 360
+    out["Speed"] = speed
+
+    # Move size in units of the HTF noise band, when the frames carry it
+    if {"RS_Ratio_Vol", "RS_Momentum_Vol"}.issubset(latest2.columns):
+        noise = np.hypot(
+            latest2["RS_Ratio_Vol"].to_numpy(dtype=float),
+            latest2["RS_Momentum_Vol"].to_numpy(dtype=float),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["Speed_Norm"] = np.where(noise > 0, speed / noise, np.nan)
+
+    return pd.DataFrame(out)
+
+
+def _latest_points(df: pd.DataFrame) -> pd.DataFrame:
+    """Latest valid row per symbol, indexed by symbol."""
+    valid = df.dropna(subset=["RS_Ratio", "RS_Momentum"])
+    valid = valid.sort_values(["Symbol", "Date"], kind="stable")
+    return valid.drop_duplicates("Symbol", keep="last").set_index("Symbol")
+
+
+def _hex_style(rgb) -> str:
+    hex_color = "#%02x%02x%02x" % tuple(int(255 * c) for c in rgb)
+    # Calculate brightness for contrast
+    brightness = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
+    text_color = "black" if brightness > 0.6 else "white"
+    return f"background-color: {hex_color}; color: {text_color};"
 
-        # Calculate the perpendicular vector components
-        rs_ratio_diff = row["RS_Ratio_Diff"]
-        rs_momentum_diff = row["RS_Momentum_Diff"]
 
-        # Calculate the magnitude of the velocity vector
-        velocity_magnitude = np.sqrt(rs_ratio_diff**2 + rs_momentum_diff**2)
+# Precomputed cell styles: one per RdBu_11 bin (plus "" for NaN) and one per quadrant
+LOG_DIFF_STYLES = np.array([_hex_style(rgb) for rgb in RdBu_11.mpl_colors] + [""])
+QUADRANT_STYLES = {
+    q: f"background-color: {color}; color: black;"
+    for q, color in QUADRANT_COLORS.items()
+}
 
-        # Calculate the perpendicular vector components
-        row["Perp_RS_Ratio"] = -rs_momentum_diff / velocity_magnitude
-        row["Perp_RS_Momentum"] = rs_ratio_diff / velocity_magnitude
+VELOCITY_VALUE_COLUMNS = [
+    "RS_Ratio_Diff",
+    "RS_Momentum_Diff",
+    "RS_Ratio_HTF",
+    "RS_Momentum_HTF",
+    "RS_Ratio_LTF",
+    "RS_Momentum_LTF",
+]
+LOG_DIFF_COLUMNS = ["Distance_LogPct_Diff", "Perp_RS_Ratio", "Perp_RS_Momentum"]
 
-        diff_data.append(row)
 
-    return pd.DataFrame(diff_data)
+def log_diff_styles(values: np.ndarray) -> np.ndarray:
+    """RdBu_11 cell style for each value, clamped to [-1, 1]; no style for NaN."""
+    values = np.asarray(values, dtype=float)
+    n_bins = len(RdBu_11.mpl_colors)
+    norm = (np.clip(values, -1, 1) + 1) / 2
+    idx = np.where(np.isnan(norm), n_bins, (np.nan_to_num(norm) * (n_bins - 1)))
+    return LOG_DIFF_STYLES[idx.astype(int)]
 
 
-def rrg_velocity_table(diff_df: pd.DataFrame):
+def rrg_velocity_table(
+    diff_df: pd.DataFrame, page_size: Optional[int] = None, page: int = 0
+):
     """
     Sorts and styles the velocity table.
     - Adds Distance_HTF and Distance_LTF columns (distance from (100, 100)).
     - Styles the distance columns based on their quadrant.
     - Styles RS_Ratio_Diff as green/red if sign flips.
     - Renders the two _Diff columns next to one another.
+    Quadrants, distances, sort order and cell styles are computed as whole-column
+    array operations. With `page_size`, only that page of the sorted table (page 0
+    is the top N) is built and styled, so the browser never receives the rest.
     """
-    df = diff_df.copy()
-    for col in [
-        "RS_Ratio_Diff",
-        "RS_Momentum_Diff",
-        "RS_Ratio_HTF",
-        "RS_Momentum_HTF",
-        "RS_Ratio_LTF",
-        "RS_Momentum_LTF",
-    ]:
-        if col not in df.columns:
-            df[col] = 0
+    n = len(diff_df)
+    values = {}
+    for col in VELOCITY_VALUE_COLUMNS:
+        if col in diff_df.columns:
+            values[col] = np.round(diff_df[col].fillna(0).to_numpy(dtype=float), 2)
         else:
-            df[col] = df[col].fillna(0)
-            df[col] = df[col].round(2)
+            values[col] = np.zeros(n)
 
-    df = df.sort_values(
-        by=["RS_Momentum_Diff", "RS_Ratio_HTF"], ascending=[True, False]
-    ).reset_index(drop=True)
+    # Sort by momentum change (ascending), then HTF ratio (descending), in numpy
+    order = np.lexsort((-values["RS_Ratio_HTF"], values["RS_Momentum_Diff"]))
+    if page_size is not None:
+        order = order[page * page_size : (page + 1) * page_size]
+    values = {col: v[order] for col, v in values.items()}
 
     # Assign quadrants for HTF and LTF
-    df["Quadrant_HTF"] = df.apply(
-        lambda row: assign_quadrant(row["RS_Ratio_HTF"], row["RS_Momentum_HTF"]), axis=1
+    quadrant_htf = classify_quadrants(values["RS_Ratio_HTF"], values["RS_Momentum_HTF"])
+    quadrant_ltf = classify_quadrants(values["RS_Ratio_LTF"], values["RS_Momentum_LTF"])
+
+    # Calculate distances
+    distance_htf = np.hypot(
+        values["RS_Ratio_HTF"] - 100, values["RS_Momentum_HTF"] - 100
     )
-    df["Quadrant_LTF"] = df.apply(
-        lambda row: assign_quadrant(row["RS_Ratio_LTF"], row["RS_Momentum_LTF"]), axis=1
+    distance_ltf = np.hypot(
+        values["RS_Ratio_LTF"] - 100, values["RS_Momentum_LTF"] - 100
     )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_diff = np.log(distance_htf / distance_ltf)
 
-    # Calculate distances
-    df["Distance_HTF"] = (
-        (df["RS_Ratio_HTF"] - 100) ** 2 + (df["RS_Momentum_HTF"] - 100) ** 2
-    ) ** 0.5
-    df["Distance_LTF"] = (
-        (df["RS_Ratio_LTF"] - 100) ** 2 + (df["RS_Momentum_LTF"] - 100) ** 2
-    ) ** 0.5
-    df["Distance_LogPct_Diff"] = np.log(df["Distance_HTF"] / df["Distance_LTF"])
-    df["Distance_HTF"] = df["Distance_HTF"].round(2)
-    df["Distance_LTF"] = df["Distance_LTF"].round(2)
-
-    # Save the quadrant columns for styling, then drop them for display
-    quadrant_htf = df["Quadrant_HTF"]
-    quadrant_ltf = df["Quadrant_LTF"]
-
-    # Reorder columns: Symbol, RS_Ratio_Diff, RS_Momentum_Diff, Distance_HTF, Distance_LTF, ...
-    base_cols = [
-        "Symbol",
-        "Distance_HTF",
-        "Distance_LTF",
-        "Distance_LogPct_Diff",
-    ]
-    display_cols = [col for col in base_cols if col in df.columns]
-    display_cols += [
+    # Columns: Symbol, Distance_HTF, Distance_LTF, Distance_LogPct_Diff, then the rest
+    rest = [
         col
-        for col in df.columns
-        if col not in display_cols
-        and col
-        not in (
-            "Quadrant_HTF",
-            "Quadrant_LTF",
-            "RS_Ratio_HTF",
-            "RS_Momentum_HTF",
-            "RS_Ratio_LTF",
-            "RS_Momentum_LTF",
-            "RS_Ratio_Diff",
-            "RS_Momentum_Diff",
-        )
+        for col in diff_df.columns
+        if col != "Symbol" and col not in VELOCITY_VALUE_COLUMNS
     ]
-    df_display = df[display_cols].copy()
-
-    # Now, for styling, we need to know the quadrant for each row
-    def style_func_htf(row):
-        idx = row.name
-        styles = []
-        for col in df_display.columns:
-            if col == "Distance_HTF":
-                styles.append(color_quadrant(row[col], quadrant_htf.iloc[idx]))
-            elif col == "Distance_LTF":
-                styles.append(color_quadrant(row[col], quadrant_ltf.iloc[idx]))
-            elif col == "Distance_LogPct_Diff":
-                styles.append(color_log_diff(row[col]))
-            elif col == "Perp_RS_Ratio":
-                styles.append(color_log_diff(row[col]))
-            elif col == "Perp_RS_Momentum":
-                styles.append(color_log_diff(row[col]))
-            else:
-                styles.append("")
-        return styles
-
-    def color_log_diff(val):
-        # Clamp val to [-1, 1]
-        val = max(-1, min(1, val))
-        # Normalize to [0, 1]
-        norm_val = (val + 1) / 2
-        # Get color from colormap
-        idx = int(norm_val * (len(RdBu_11.mpl_colors) - 1))
-        rgb = RdBu_11.mpl_colors[idx]
-        # Convert to hex
-        hex_color = "#%02x%02x%02x" % tuple(int(255 * c) for c in rgb)
-        # Calculate brightness for contrast
-        brightness = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
-        text_color = "black" if brightness > 0.6 else "white"
-        return f"background-color: {hex_color}; color: {text_color};"
-
-    def color_quadrant(val, quadrant):
-        color = QUADRANT_COLORS.get(quadrant, "rgba(255,255,255,0.3)")
-        return f"background-color: {color}; color: black;"
-
-    styled = df_display.style.apply(style_func_htf, axis=1)
+    df_display = pd.DataFrame(
+        {
+            "Symbol": diff_df["Symbol"].to_numpy()[order],
+            "Distance_HTF": np.round(distance_htf, 2),
+            "Distance_LTF": np.round(distance_ltf, 2),
+            "Distance_LogPct_Diff": log_diff,
+            **{col: diff_df[col].to_numpy()[order] for col in rest},
+        }
+    )
+
+    # One style array per column, built once for the whole page
+    column_styles = {
+        "Distance_HTF": quadrant_color_array(quadrant_htf, QUADRANT_STYLES, ""),
+        "Distance_LTF": quadrant_color_array(quadrant_ltf, QUADRANT_STYLES, ""),
+    }
+    for col in LOG_DIFF_COLUMNS:
+        if col in df_display.columns:
+            column_styles[col] = log_diff_styles(df_display[col].to_numpy())
+    styles = pd.DataFrame("", index=df_display.index, columns=df_display.columns)
+    for col, col_styles in column_styles.items():
+        styles[col] = col_styles
+
+    styled = df_display.style.apply(lambda _: styles, axis=None)
     styled = styled.format(
         {col: "{:.2f}" for col in df_display.select_dtypes(include="number").columns}
     )
@@ -1,9 +1,9 @@
 import streamlit as st
 from components.rrg_plot import plot_rrg, plot_rrg_diff
-from data.finance import (
-    get_latest_valid_points,
-    get_rrg_data,
-)
+from components.rrg_table import build_rrg_table
+from data.finance import get_rrg_panel
+from data.snapshots import SnapshotCube
+from data.universe import PriceUniverse
 from data.velocity import compare_rrg_timeframes, rrg_velocity_table
 
 st.set_page_config(page_title="Relative Rotation Graph (RRG)", layout="wide")
@@ -123,18 +123,39 @@ group_name = st.selectbox(
     help="Choose which group of tickers to display.",
 )
 selected_tickers = GROUPS[group_name]
-# map through all groups and create set of tickers
-all_tickers = set()
-for group in GROUPS.values():
-    all_tickers.update(group)
-all_tickers = list(all_tickers)
+
+comparison_options = [
+    ("1mo", "6mo"),
+    ("6mo", "1y"),
+]
+
+
+@st.cache_resource(ttl=3600, show_spinner="Loading prices for all groups...")
+def load_universe(groups, benchmarks, periods):
+    # One batched download for every group and benchmark, shared across reruns
+    return PriceUniverse(dict(groups), benchmarks, list(periods)).load()
+
+
+standard_benchmarks = tuple(
+    option for option in benchmark_options if option != "Other (type below)"
+)
+universe = load_universe(
+    tuple((name, tuple(tickers)) for name, tickers in GROUPS.items()),
+    standard_benchmarks,
+    tuple(sorted({p for pair in comparison_options for p in pair})),
+)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_rrg(group_name, benchmarks, period):
+    # RRG against every benchmark in one pass, so switching benchmark is a lookup
+    tickers = GROUPS[group_name]
+    daily_prices = universe.ensure(benchmarks).prices(tickers + list(benchmarks))
+    return get_rrg_panel(tickers, list(benchmarks), period, daily_prices=daily_prices)
+
 
 # Only proceed if benchmark is not empty
 if benchmark:
-    comparison_options = [
-        ("1mo", "6mo"),
-        ("6mo", "1y"),
-    ]
     comparison_labels = [f"{a} vs {b}" for a, b in comparison_options]
     selected_comparison = st.selectbox(
         "Select timeframe comparison",
@@ -144,9 +165,12 @@ if benchmark:
     )
     period_a, period_b = comparison_options[selected_comparison]
 
-    # Fetch data for both periods
-    rrg_a, dropped_a = get_rrg_data(selected_tickers, benchmark, period_a)
-    rrg_b, dropped_b = get_rrg_data(selected_tickers, benchmark, period_b)
+    # Computed from the shared daily panel for all benchmarks, then looked up
+    benchmarks = tuple(dict.fromkeys(standard_benchmarks + (benchmark,)))
+    panels_a, dropped_a = load_rrg(group_name, benchmarks, period_a)
+    panels_b, dropped_b = load_rrg(group_name, benchmarks, period_b)
+    panel_a, panel_b = panels_a[benchmark], panels_b[benchmark]
+    rrg_a, rrg_b = panel_a.to_long(), panel_b.to_long()
 
     # Last updated for higher-timeframe group
     if not rrg_b.empty and "Date" in rrg_b.columns:
@@ -154,7 +178,15 @@ if benchmark:
 
     if not rrg_a.empty and not rrg_b.empty:
         diff_df = compare_rrg_timeframes(rrg_a, rrg_b)
-        styled_velocity_table = rrg_velocity_table(diff_df)
+        # Only one page of rows is styled and sent to the browser
+        page_size = 50
+        n_pages = max(1, -(-len(diff_df) // page_size))
+        page = 1
+        if n_pages > 1:
+            page = st.number_input("Table page", min_value=1, max_value=n_pages, value=1)
+        styled_velocity_table = rrg_velocity_table(
+            diff_df, page_size=page_size, page=page - 1
+        )
         st.dataframe(styled_velocity_table)
 
         fig_diff = plot_rrg_diff(
@@ -171,6 +203,15 @@ if benchmark:
     else:
         st.warning("Not enough data to compare these periods for the selected tickers.")
 
+    # Cross-group summary of the latest HTF points, ranked by quadrant and distance
+    if st.checkbox("Show summary table for all groups", value=False):
+        category_dfs = [
+            (load_rrg(name, benchmarks, period_b)[0][benchmark].latest_points(), name)
+            for name in GROUPS
+        ]
+        summary_table, _ = build_rrg_table(category_dfs)
+        st.dataframe(summary_table)
+
     # Use rrg_b (HTF) for single-period analysis
     show_single_rrg = st.checkbox("Show single-period RRG charts", value=False)
     try:
@@ -179,24 +220,52 @@ if benchmark:
             and not rrg_b.empty
             and {"RS_Ratio", "RS_Momentum", "Symbol"}.issubset(rrg_b.columns)
         ):
-            latest_points_htf = get_latest_valid_points(rrg_b)
-            latest_points_ltf = get_latest_valid_points(rrg_a)
-            fig_htf = plot_rrg(
-                rrg_b,
-                latest_points=latest_points_htf,
-                max_points_per_ticker=4,
-                period=period_b,
-                fix_axes=True,
-            )
-            st.plotly_chart(fig_htf, use_container_width=True)
-            fig_ltf = plot_rrg(
-                rrg_a,
-                latest_points=latest_points_ltf,
-                max_points_per_ticker=4,
-                period=period_a,
-                fix_axes=True,
+            tail = 4
+            animate = st.checkbox(
+                "Animate in the browser",
+                value=False,
+                help="Play and scrub through history without rerunning the app.",
             )
-            st.plotly_chart(fig_ltf, use_container_width=True)
+            if animate:
+                # Every bar is a precomputed Plotly frame; playback is client-side
+                for rrg, period in ((rrg_b, period_b), (rrg_a, period_a)):
+                    fig = plot_rrg(
+                        rrg,
+                        latest_points=None,
+                        max_points_per_ticker=tail,
+                        period=period,
+                        fix_axes=True,
+                        animate=True,
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+            else:
+                # Scrub through history: each position is a slice of the snapshot cube
+                cube_b = SnapshotCube.from_panel(panel_b)
+                cube_a = SnapshotCube.from_panel(panel_a)
+                as_of_dates = cube_b.valid_dates()
+                if as_of_dates.empty:
+                    st.warning("No RRG points to show yet for the selected tickers.")
+                else:
+                    as_of = st.select_slider(
+                        "As of",
+                        options=list(as_of_dates),
+                        value=as_of_dates[-1],
+                        format_func=lambda d: d.strftime("%Y-%m-%d"),
+                        help="Show the RRG as it stood on an earlier date.",
+                    )
+                    for cube, period in ((cube_b, period_b), (cube_a, period_a)):
+                        t = cube.position(as_of)
+                        # A timeframe whose bars all come after `as_of` is skipped
+                        if t < 0:
+                            continue
+                        fig = plot_rrg(
+                            cube.tail_frame(t, tail),
+                            latest_points=cube.latest_frame(t, tail),
+                            max_points_per_ticker=tail,
+                            period=period,
+                            fix_axes=True,
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.error(f"Error fetching RRG data for {group_name}: {e}")
 
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app runs from app/, where components and data are top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+
+def make_random_panel(n_dates=400, n_symbols=12, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-01", periods=n_dates, freq="B", name="Date")
+    log_prices = np.cumsum(rng.normal(0, 0.02, (n_dates, n_symbols + 1)), axis=0)
+    prices = pd.DataFrame(
+        100 * np.exp(log_prices),
+        index=dates,
+        columns=[f"S{i}" for i in range(n_symbols)] + ["SPY"],
+    )
+    # Ragged histories: late listings and scattered missing bars
+    prices.iloc[: n_dates // 3, 1] = np.nan
+    prices.iloc[rng.choice(n_dates, 25, replace=False), 2] = np.nan
+    prices.iloc[:, 3] = np.nan
+    return prices
+
+
+@pytest.fixture
+def random_panel():
+    """make_random_panel(n_dates, n_symbols, seed): ragged prices with an SPY column."""
+    return make_random_panel
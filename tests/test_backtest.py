@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from app.data.backtest import backtest_quadrant_rotation, quadrant_positions
+from app.data.finance import get_rrg_panel
+from app.data.providers import BARS_PER_YEAR
+
+# Leading, Improving, Weakening, Lagging, missing
+L, I, W, G = (101, 101), (99, 101), (101, 99), (99, 99)
+
+
+def _coords(path):
+    return np.array([p[0] for p in path], float), np.array([p[1] for p in path], float)
+
+
+def test_entry_rule_only_holds_runs_entered_from_improving():
+    # Column 0 enters Leading from Improving, column 1 from Weakening
+    x0, y0 = _coords([G, I, L, L, W, L])
+    x1, y1 = _coords([G, W, L, L, I, I])
+    rsr = np.column_stack([x0, x1])
+    rsm = np.column_stack([y0, y1])
+    positions = quadrant_positions(rsr, rsm, hold=["Leading"], entry_from=["Improving"])
+    assert positions[:, 0].tolist() == [False, False, True, True, False, False]
+    assert not positions[:, 1].any()
+    assert quadrant_positions(rsr, rsm)[:, 1].tolist() == [
+        False,
+        False,
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_backtest_returns_use_previous_bar_weights(random_panel):
+    prices = random_panel(n_dates=300, n_symbols=5, seed=9)
+    panel, _ = get_rrg_panel(
+        list(prices.columns[:-1]), "SPY", "2y", daily_prices=prices
+    )
+    result = backtest_quadrant_rotation(panel, hold=["Leading", "Improving"])
+
+    weights = result.weights.to_numpy()
+    held = weights.sum(axis=1)
+    assert np.allclose(held[held > 0], 1.0)
+    asset_returns = pd.DataFrame(panel.price, index=panel.dates).ffill().pct_change()
+    expected = result.weights.shift(1).to_numpy() * asset_returns.to_numpy()
+    expected = np.nansum(expected, axis=1)
+    np.testing.assert_allclose(result.returns.to_numpy(), expected)
+
+    # The long frame gives the same result as the panel
+    long_result = backtest_quadrant_rotation(
+        panel.to_long(), hold=["Leading", "Improving"], weighting="distance"
+    )
+    panel_result = backtest_quadrant_rotation(
+        panel, hold=["Leading", "Improving"], weighting="distance"
+    )
+    np.testing.assert_allclose(long_result.returns, panel_result.returns)
+    summary = panel_result.summary(BARS_PER_YEAR["1wk"])
+    assert set(summary.index) >= {"CAGR", "Sharpe", "Max_Drawdown"}
+
+
+def test_missing_bars_keep_position_and_price_move():
+    dates = pd.date_range("2024-01-01", periods=4, freq="B", name="Date")
+    # Held in Leading, missing on bar 1, up 10% from its last valid price on bar 2
+    long = pd.DataFrame(
+        {
+            "Symbol": "A",
+            "Date": dates,
+            "Price": [100.0, np.nan, 110.0, 110.0],
+            "RS_Ratio": [101.0, np.nan, 101.0, 101.0],
+            "RS_Momentum": [101.0, np.nan, 101.0, 101.0],
+        }
+    )
+    result = backtest_quadrant_rotation(long)
+    np.testing.assert_allclose(result.returns, [0, 0, 0.1, 0])
+    assert result.weights["A"].tolist() == [1, 1, 1, 1]
+    assert result.turnover.iloc[1:].eq(0).all()
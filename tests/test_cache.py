@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from app.data.cache import PriceCache
+from app.data.finance import fetch_prices
+from app.data.providers import PriceProvider
+
+
+def _fake_history(symbols, dates):
+    return pd.DataFrame(
+        {s: np.linspace(10, 20, len(dates)) + i for i, s in enumerate(symbols)},
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
+
+
+def test_cache_merge_prefers_new_bars(tmp_path):
+    cache = PriceCache(tmp_path)
+    dates = pd.date_range("2024-01-01", periods=5, freq="D")
+    cache.merge("AAPL", "1d", pd.Series([1.0, 2, 3, 4, 5], index=dates), covered_from=None)
+    # Last bar revised and one new bar appended
+    update = pd.Series([6.0, 7.0], index=[dates[-1], dates[-1] + pd.Timedelta(days=1)])
+    cache.merge("AAPL", "1d", update)
+    stored = cache.load("AAPL", "1d")
+    assert list(stored) == [1.0, 2, 3, 4, 6, 7]
+    assert cache.covers("AAPL", "1d", start=None)
+    assert not cache.covers("AAPL", "1wk", start=None)
+
+
+def test_fetch_prices_incremental_refresh(tmp_path):
+    calls = []
+    today = pd.Timestamp.now().normalize()
+    history = _fake_history(["AAPL", "SPY"], pd.date_range(end=today, periods=40))
+
+    class RecordingProvider(PriceProvider):
+        cacheable = True
+
+        def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+            calls.append({"symbols": list(symbols), "period": period, "start": start})
+            data = history[list(symbols)]
+            if start is not None:
+                data = data[data.index >= start]
+            return data
+
+    provider = RecordingProvider()
+    cache = PriceCache(tmp_path)
+
+    first = fetch_prices(["AAPL", "SPY"], period="1mo", cache=cache, provider=provider)
+    assert calls[-1]["period"] == "1mo"
+    second = fetch_prices(["AAPL", "SPY"], period="1mo", cache=cache, provider=provider)
+    # Second call only asks for bars from the last stored timestamps, overlapping
+    # one completed bar
+    assert calls[-1]["start"] == history.index[-2]
+    pd.testing.assert_frame_equal(first, second)
+
+    # A longer period than was ever stored falls back to a full download
+    fetch_prices(["AAPL"], period="1y", cache=cache, provider=provider)
+    assert calls[-1]["period"] == "1y"
+
+
+class HistoryProvider(PriceProvider):
+    """Serves (and records requests for) a mutable history frame."""
+
+    cacheable = True
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        self.calls.append({"symbols": list(symbols), "period": period, "start": start})
+        data = self.history[list(symbols)]
+        if start is not None:
+            data = data[data.index >= start]
+        return data.dropna(how="all")
+
+
+def test_fetch_prices_refetches_readjusted_history(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    dates = pd.date_range(end=today, periods=40)
+    provider = HistoryProvider(pd.DataFrame({"AAPL": 100.0, "SPY": 20.0}, index=dates))
+    cache = PriceCache(tmp_path)
+    fetch_prices(["AAPL", "SPY"], period="1mo", cache=cache, provider=provider)
+
+    # A 2:1 split: the provider re-adjusts AAPL's whole history
+    provider.history["AAPL"] = 50.0
+    provider.calls.clear()
+    data = fetch_prices(["AAPL", "SPY"], period="1mo", cache=cache, provider=provider)
+    assert (data["AAPL"] == 50.0).all() and (data["SPY"] == 20.0).all()
+    assert provider.calls[-1] == {"symbols": ["AAPL"], "period": "1mo", "start": None}
+    assert cache.covers("AAPL", "1d", start=today - pd.DateOffset(months=1))
+
+
+def test_fetch_prices_groups_refreshes_by_last_bar(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    dates = pd.date_range(end=today, periods=40)
+    history = _fake_history(["AAPL", "SPY", "OLD"], dates)
+    provider = HistoryProvider(history)
+    cache = PriceCache(tmp_path)
+    # OLD stopped trading ten days ago
+    history.loc[history.index[-10:], "OLD"] = np.nan
+    fetch_prices(["AAPL", "SPY", "OLD"], period="1mo", cache=cache, provider=provider)
+
+    provider.calls.clear()
+    fetch_prices(["AAPL", "SPY", "OLD"], period="1mo", cache=cache, provider=provider)
+    starts = {tuple(call["symbols"]): call["start"] for call in provider.calls}
+    assert starts == {("AAPL", "SPY"): history.index[-2], ("OLD",): history.index[-12]}
@@ -0,0 +1,147 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.data import providers
+from app.data.downloader import ChunkedDownloader, TokenBucket
+from app.data.finance import get_rrg_data
+from app.data.providers import SyntheticProvider, YFinanceProvider
+
+
+class FlakyProvider(SyntheticProvider):
+    """Raises for chunks containing BAD, and throttles the first call for every full chunk."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        self.calls.append(tuple(symbols))
+        if "BAD" in symbols:
+            raise RuntimeError("poisoned chunk")
+        if len(symbols) > 1 and self.calls.count(tuple(symbols)) == 1:
+            raise RuntimeError("throttled")
+        return super().download(symbols, interval, period, start, auto_adjust)
+
+
+def test_chunked_downloader_retries_and_isolates_failures():
+    symbols = [f"S{i}" for i in range(9)] + ["BAD"]
+    inner = FlakyProvider(end="2024-06-28")
+    downloader = ChunkedDownloader(
+        inner,
+        chunk_size=4,
+        max_workers=3,
+        requests_per_second=1000,
+        sleep=lambda s: None,
+    )
+    data, failed = downloader.download_with_failures(symbols, "1d", period="1mo")
+    assert failed == ["BAD"]
+    assert list(data.columns) == symbols[:-1]
+    # S8 shared a chunk with BAD and was recovered by bisection
+    assert ("S8",) in inner.calls
+
+
+class ThrottledProvider(SyntheticProvider):
+    """Rate-limits the first `throttle` calls, then serves every request."""
+
+    def __init__(self, throttle, **kwargs):
+        super().__init__(**kwargs)
+        self.throttle = throttle
+        self.calls = []
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        self.calls.append(tuple(symbols))
+        if len(self.calls) <= self.throttle:
+            raise RuntimeError("429 Too Many Requests")
+        return super().download(symbols, interval, period, start, auto_adjust)
+
+
+def test_throttled_chunks_are_retried_not_bisected():
+    symbols = [f"S{i}" for i in range(8)]
+    sleeps = []
+    inner = ThrottledProvider(throttle=2, end="2024-06-28")
+    downloader = ChunkedDownloader(
+        inner, chunk_size=8, requests_per_second=1000, sleep=sleeps.append
+    )
+    data, failed = downloader.download_with_failures(symbols, "1d", period="1mo")
+    assert failed == [] and list(data.columns) == symbols
+    assert inner.calls == [tuple(symbols)] * 3
+    assert sleeps == [1.0, 2.0]
+
+    # Still throttled after every retry: reported as failed, without splitting
+    inner = ThrottledProvider(throttle=100, end="2024-06-28")
+    downloader = ChunkedDownloader(
+        inner, chunk_size=8, requests_per_second=1000, sleep=lambda s: None
+    )
+    data, failed = downloader.download_with_failures(symbols, "1d", period="1mo")
+    assert failed == symbols
+    assert inner.calls == [tuple(symbols)] * 4
+
+
+def fake_yf_download(failures):
+    """
+    Stand-in for yf.download: like yfinance, it never raises, but logs each failing
+    ticker's error and returns an all-NaN column for it. `failures` maps a call
+    number to (symbols, error message).
+    """
+    calls = []
+
+    def download(tickers, interval, auto_adjust, progress, **kwargs):
+        calls.append(list(tickers))
+        dates = pd.date_range("2024-06-03", periods=5, freq="B", name="Date")
+        closes = pd.DataFrame({t: np.linspace(10, 11, 5) for t in tickers}, index=dates)
+        failed, message = failures.get(len(calls), ([], None))
+        for ticker in failed:
+            closes[ticker] = np.nan
+        if failed:
+            logging.getLogger("yfinance").error(f"{failed}: {message}")
+        closes.columns = pd.MultiIndex.from_product([["Close"], closes.columns])
+        return closes
+
+    return download, calls
+
+
+def test_yfinance_rate_limits_are_retried(monkeypatch):
+    symbols = ["AAA", "BBB", "CCC"]
+    rate_limited = "YFRateLimitError('Too Many Requests. Rate limited.')"
+    download, calls = fake_yf_download({1: (["BBB"], rate_limited)})
+    monkeypatch.setattr(providers.yf, "download", download)
+    downloader = ChunkedDownloader(
+        YFinanceProvider(), requests_per_second=1000, sleep=lambda s: None
+    )
+    data, failed = downloader.download_with_failures(symbols, "1d", period="5d")
+    assert failed == [] and list(data.columns) == symbols
+    assert calls == [symbols, symbols]
+
+    # A ticker yfinance simply has no data for is not retried
+    download, calls = fake_yf_download({1: (["BBB"], "possibly delisted")})
+    monkeypatch.setattr(providers.yf, "download", download)
+    data, failed = downloader.download_with_failures(symbols, "1d", period="5d")
+    assert failed == ["BBB"] and calls == [symbols]
+
+
+def test_failed_symbols_are_reported_as_dropped():
+    downloader = ChunkedDownloader(
+        FlakyProvider(end="2024-06-28"),
+        chunk_size=2,
+        requests_per_second=1000,
+        sleep=lambda s: None,
+    )
+    df, dropped = get_rrg_data(["AAA", "BAD", "CCC"], "SPY", "6mo", provider=downloader)
+    assert dropped == ["BAD"]
+    assert set(df["Symbol"]) == {"AAA", "CCC"}
+
+
+def test_token_bucket_waits_when_empty():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+    assert sum(waits) == pd.Timedelta(seconds=1).total_seconds()
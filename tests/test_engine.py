@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from app.data.engine import rolling_mean_std, prefix_moments
+from app.data.finance import (
+    calculate_rs_ratio_and_momentum,
+    calculate_rs_ratio_and_momentum_windows,
+)
+
+
+def reference_rs_ratio_and_momentum(prices, benchmark, window=10, ragged=True):
+    """
+    The original per-symbol, per-date implementation, kept as the parity reference.
+    With `ragged`, each symbol's RS first drops its missing bars so the rolling
+    windows run over its own history (the ragged-history behaviour); without it,
+    this is the original code exactly, which agrees with it on dense panels.
+    """
+    results = []
+    for symbol in prices.columns:
+        if symbol == benchmark.name:
+            continue
+        rs = 100 * (prices[symbol] / benchmark)
+        if ragged:
+            rs = rs.dropna()
+        rs_mean = rs.rolling(window=window).mean()
+        rs_std = rs.rolling(window=window).std(ddof=0)
+        rsr = 100 + (rs - rs_mean) / rs_std
+        rsr_roc = 100 * (rsr / rsr.shift(1) - 1)
+        rsm_mean = rsr_roc.rolling(window=window).mean()
+        rsm_std = rsr_roc.rolling(window=window).std(ddof=0)
+        rsm = 101 + (rsr_roc - rsm_mean) / rsm_std
+        valid_idx = rsr.index.intersection(rsm.index)
+        for date in valid_idx:
+            results.append(
+                {
+                    "Symbol": symbol,
+                    "Date": date,
+                    "RS_Ratio": rsr.loc[date],
+                    "RS_Momentum": rsm.loc[date],
+                }
+            )
+    return pd.DataFrame(results)
+
+
+def test_engine_matches_reference_implementation(random_panel):
+    prices = random_panel()
+    for window in (7, 20, 50):
+        expected = reference_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        result = calculate_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        assert list(result["Symbol"]) == list(expected["Symbol"])
+        assert list(result["Date"]) == list(expected["Date"])
+        for col in ["RS_Ratio", "RS_Momentum"]:
+            np.testing.assert_allclose(
+                result[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True
+            )
+
+
+def test_engine_matches_original_on_dense_panel(random_panel):
+    # Without missing bars the ragged-history handling must not change anything
+    prices = random_panel().drop(columns=["S1", "S2", "S3"])
+    for window in (7, 20):
+        expected = reference_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window, ragged=False
+        )
+        result = calculate_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        assert list(result["Symbol"]) == list(expected["Symbol"])
+        assert list(result["Date"]) == list(expected["Date"])
+        for col in ["RS_Ratio", "RS_Momentum"]:
+            np.testing.assert_allclose(
+                result[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True
+            )
+
+def test_rolling_mean_std_matches_pandas():
+    x = np.random.default_rng(1).normal(50, 5, (300, 3))
+    x[10, 0] = np.nan
+    mean, std = rolling_mean_std(prefix_moments(x), 20, len(x))
+    frame = pd.DataFrame(x)
+    np.testing.assert_allclose(mean, frame.rolling(20).mean(), equal_nan=True)
+    np.testing.assert_allclose(std, frame.rolling(20).std(ddof=0), equal_nan=True)
+
+
+def test_long_trending_history_matches_reference():
+    # 30 years of daily bars with strong drifts: prefix sums over the whole history
+    # would lose precision here
+    rng = np.random.default_rng(3)
+    n_dates = 7500
+    dates = pd.date_range("1995-01-02", periods=n_dates, freq="B", name="Date")
+    log_prices = np.cumsum(rng.normal(0.0008, 0.015, (n_dates, 4)), axis=0)
+    log_prices[:, -1] = np.cumsum(rng.normal(0.0002, 0.01, n_dates))
+    prices = pd.DataFrame(
+        100 * np.exp(log_prices), index=dates, columns=["S0", "S1", "S2", "SPY"]
+    )
+    for window in (7, 50):
+        expected = reference_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        result = calculate_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        for col in ["RS_Ratio", "RS_Momentum"]:
+            np.testing.assert_allclose(
+                result[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True
+            )
+
+    trend = np.cumsum(rng.normal(1, 1, (n_dates, 2)), axis=0)
+    mean, std = rolling_mean_std(prefix_moments(trend, 300), 300, n_dates)
+    frame = pd.DataFrame(trend)
+    np.testing.assert_allclose(mean, frame.rolling(300).mean(), equal_nan=True)
+    np.testing.assert_allclose(std, frame.rolling(300).std(ddof=0), equal_nan=True)
+
+
+def test_window_sweep_matches_single_window_runs(random_panel):
+    prices = random_panel(n_dates=300, n_symbols=5, seed=2)
+    windows = [7, 20, 50]
+    tensor = calculate_rs_ratio_and_momentum_windows(
+        prices.drop(columns="SPY"), prices["SPY"], windows
+    )
+    assert tensor.rs_ratio.shape == (3, 5, 300)
+    for window in windows:
+        expected = calculate_rs_ratio_and_momentum(
+            prices.drop(columns="SPY"), prices["SPY"], window
+        )
+        pd.testing.assert_frame_equal(tensor.frame(window), expected)
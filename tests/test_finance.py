@@ -1,13 +1,17 @@
 import numpy as np
 import pandas as pd
+import pytest
 
 from app.data.finance import (
+    fetch_daily_prices,
     fetch_prices,
     get_rrg_data,
     interval_map,
     period_options,
+    resample_prices,
     window_map,
 )
+from app.data.providers import FileProvider, PriceProvider, SyntheticProvider
 
 
 def test_fetch_prices_valid():
@@ -75,3 +79,96 @@ def test_window_and_interval_logic():
         window = window_map.get(period)
         assert interval is not None
         assert window is not None
+
+
+def test_get_rrg_data_synthetic_provider():
+    tickers = ["AAPL", "MSFT"]
+    provider = SyntheticProvider(seed=1, end="2024-06-28")
+    df, dropped = get_rrg_data(tickers, "SPY", period="1y", provider=provider)
+    assert dropped == []
+    assert set(df["Symbol"]) == set(tickers)
+    assert df["RS_Ratio"].notna().any()
+    # Same seed, same prices
+    again, _ = get_rrg_data(tickers, "SPY", period="1y", provider=provider)
+    pd.testing.assert_frame_equal(df, again)
+
+
+def test_file_provider_reads_csv_and_parquet(tmp_path):
+    dates = pd.date_range("2023-01-02", periods=30, freq="B", name="Date")
+    pd.DataFrame({"Close": np.arange(30.0) + 1}, index=dates).to_csv(tmp_path / "AAA.csv")
+    pd.DataFrame({"Close": np.arange(30.0) + 2}, index=dates).to_parquet(
+        tmp_path / "BBB.parquet"
+    )
+    provider = FileProvider(tmp_path)
+    prices = fetch_prices(["AAA", "BBB", "MISSING"], period="1mo", provider=provider)
+    assert list(prices.columns) == ["AAA", "BBB"]
+    assert prices.index.max() == dates[-1]
+    assert prices.index.min() >= dates[-1] - pd.DateOffset(months=1)
+
+
+def test_provider_without_download_fails_on_construction():
+    class Incomplete(PriceProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        PriceProvider()
+
+def test_resample_prices_takes_last_close_per_bucket():
+    dates = pd.date_range("2024-01-01", "2024-03-31", freq="B", name="Date")
+    daily = pd.DataFrame({"AAA": np.arange(len(dates), dtype=float)}, index=dates)
+    daily.iloc[-1, 0] = np.nan  # a missing final bar falls back to the previous close
+    weekly = resample_prices(daily, "1wk")
+    assert weekly.index[0] == pd.Timestamp("2024-01-01")
+    assert weekly["AAA"].iloc[0] == 4.0
+    monthly = resample_prices(daily, "1mo")
+    assert list(monthly.index) == list(pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]))
+    assert monthly["AAA"].iloc[-1] == daily["AAA"].iloc[-2]
+    assert len(resample_prices(daily, "3mo")) == 1
+    assert resample_prices(daily, "1d") is daily
+
+
+def test_get_rrg_data_shared_daily_panel():
+    tickers = ["AAPL", "MSFT"]
+    provider = SyntheticProvider(seed=2, end="2024-06-28")
+    daily = fetch_daily_prices(tickers + ["SPY"], ["1mo", "1y"], provider=provider)
+    for period in ["1mo", "1y"]:
+        shared, _ = get_rrg_data(tickers, "SPY", period, daily_prices=daily)
+        direct, _ = get_rrg_data(tickers, "SPY", period, provider=provider)
+        pd.testing.assert_frame_equal(shared, direct)
+
+
+def test_get_rrg_data_keeps_ragged_history():
+    provider = SyntheticProvider(seed=3, end="2024-06-28")
+    daily = fetch_daily_prices(["OLD", "NEW", "SPY"], ["1y"], provider=provider)
+    # NEW only lists for the last 80 bars and misses a few days in between
+    daily.loc[daily.index[:-80], "NEW"] = np.nan
+    daily.loc[daily.index[-30:-27], "NEW"] = np.nan
+    ragged, dropped = get_rrg_data(["OLD", "NEW"], "SPY", "6mo", daily_prices=daily)
+    full, _ = get_rrg_data(["OLD"], "SPY", "6mo", daily_prices=daily)
+    assert dropped == []
+    # OLD keeps its full history despite NEW's late listing
+    old = ragged[ragged["Symbol"] == "OLD"].reset_index(drop=True)
+    pd.testing.assert_frame_equal(old, full.reset_index(drop=True))
+    new = ragged[ragged["Symbol"] == "NEW"]
+    assert len(new) == 77
+    assert new["RS_Ratio"].notna().sum() == 77 - (window_map["6mo"] - 1)
+
+
+def test_get_rrg_data_multiple_benchmarks_match_single_runs():
+    tickers = ["AAPL", "MSFT", "GLD"]
+    provider = SyntheticProvider(seed=5, end="2024-06-28")
+    daily = fetch_daily_prices(tickers + ["SPY", "QQQ"], ["6mo"], provider=provider)
+    frames, dropped = get_rrg_data(
+        tickers, ["SPY", "QQQ", "GLD", "MISSING"], "6mo", daily_prices=daily
+    )
+    assert dropped == []
+    assert frames["MISSING"].empty
+    for benchmark in ["SPY", "QQQ", "GLD"]:
+        single, _ = get_rrg_data(tickers, benchmark, "6mo", daily_prices=daily)
+        pd.testing.assert_frame_equal(
+            frames[benchmark].reset_index(drop=True), single.reset_index(drop=True)
+        )
+    # A ticker has no RS against itself
+    assert frames["GLD"].loc[frames["GLD"]["Symbol"] == "GLD", "RS_Ratio"].isna().all()
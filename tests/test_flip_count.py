@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.data.finance import calculate_momentum_flip_count
+
+
+def reference_momentum_flip_count(df):
+    """The original row-by-row implementation, kept as the equivalence reference."""
+    df = df.sort_values(["Symbol", "Date"]).copy()
+    df["Momentum_Flip_Count"] = 0
+    for symbol in df["Symbol"].unique():
+        mask = df["Symbol"] == symbol
+        sub = df.loc[mask]
+        last_half = None
+        last_momentum = None
+        flip_count = 0
+        counts = []
+        for _, row in sub.iterrows():
+            rsr = row["RS_Ratio"]
+            rsm = row["RS_Momentum"]
+            current_half = "right" if rsr >= 100 else "left"
+            if last_half is not None and current_half != last_half:
+                flip_count = 0
+                last_momentum = None
+            if last_momentum is not None:
+                if (last_momentum < 100 and rsm >= 100) or (
+                    last_momentum >= 100 and rsm < 100
+                ):
+                    flip_count += 1
+            counts.append(flip_count)
+            last_half = current_half
+            last_momentum = rsm
+        df.loc[mask, "Momentum_Flip_Count"] = counts
+    return df
+
+
+# Values cluster around 100 so both halves and momentum crossings are common
+rrg_values = st.one_of(
+    st.floats(min_value=98, max_value=102),
+    st.sampled_from([100.0, np.nan]),
+)
+rows = st.lists(
+    st.tuples(st.sampled_from(["AAA", "BBB", "CCC"]), rrg_values, rrg_values),
+    max_size=60,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(rows)
+def test_flip_count_matches_reference(data):
+    df = pd.DataFrame(data, columns=["Symbol", "RS_Ratio", "RS_Momentum"])
+    df["Date"] = pd.date_range("2024-01-01", periods=len(df), freq="D")
+    # Shuffle so the function has to sort
+    df = df.sample(frac=1, random_state=0)
+    expected = reference_momentum_flip_count(df)
+    result = calculate_momentum_flip_count(df)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
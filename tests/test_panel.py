@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from app.data.finance import (
+    calculate_momentum_flip_count,
+    calculate_rs_ratio_and_momentum,
+    get_latest_valid_points,
+    get_rrg_panel,
+)
+from app.data.panel import PANEL_COLUMNS
+
+
+def reference_long_frame(prices, tickers, benchmark, window):
+    """The melt/merge construction get_rrg_data used before RRGPanel."""
+    prices = prices[prices[benchmark].notna()]
+    df = (
+        prices[tickers]
+        .reset_index()
+        .melt(id_vars=["Date"], var_name="Symbol", value_name="Price")
+        .dropna(subset=["Price"])
+    )
+    df = df.merge(prices[benchmark].rename("Benchmark").reset_index(), on="Date")
+    rs_df = calculate_rs_ratio_and_momentum(prices[tickers], prices[benchmark], window)
+    df = df.merge(rs_df, on=["Symbol", "Date"], how="left")
+    df = calculate_momentum_flip_count(df).reset_index(drop=True)
+    for col in ["RS_Ratio", "RS_Momentum"]:
+        df[f"{col}_Vol"] = df.groupby("Symbol")[col].transform(
+            lambda s: s.rolling(window).std(ddof=0)
+        )
+    noise = np.hypot(df["RS_Ratio_Vol"], df["RS_Momentum_Vol"])
+    distance = np.hypot(df["RS_Ratio"] - 100, df["RS_Momentum"] - 100)
+    df["Distance_Norm"] = (distance / noise).where(noise > 0)
+    df["Flip_Count_Norm"] = (df["Momentum_Flip_Count"] / df["RS_Momentum_Vol"]).where(
+        df["RS_Momentum_Vol"] > 0
+    )
+    return df[PANEL_COLUMNS]
+
+
+def test_panel_long_view_matches_melt_merge_frame(random_panel):
+    prices = random_panel(n_dates=200, n_symbols=6, seed=7)
+    tickers = [c for c in prices.columns if c != "SPY"][::-1]
+    panel, dropped = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)
+    assert dropped == ["S3"]
+    window = 20
+    period_prices = prices[prices.index >= prices.index.max() - pd.DateOffset(months=6)]
+    expected = reference_long_frame(
+        period_prices, [t for t in tickers if t != "S3"], "SPY", window
+    )
+    pd.testing.assert_frame_equal(panel.to_long(), expected, check_dtype=False)
+    assert panel.to_long() is panel.to_long()
+
+    latest = get_latest_valid_points(panel).reset_index(drop=True)
+    latest_long = get_latest_valid_points(expected).reset_index(drop=True)
+    pd.testing.assert_frame_equal(latest, latest_long, check_dtype=False)
+
+
+def test_panel_float32(random_panel):
+    prices = random_panel(n_dates=120, n_symbols=4, seed=8)
+    panel, _ = get_rrg_panel(
+        ["S0", "S1"], "SPY", "6mo", daily_prices=prices, dtype=np.float32
+    )
+    assert panel.rs_ratio.dtype == np.float32
+    assert panel.rs_ratio.shape == (len(panel.dates), 2)
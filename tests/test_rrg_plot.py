@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from app.data.finance import get_latest_valid_points, get_rrg_panel
+from app.data.velocity import compare_rrg_timeframes
+from components.quadrant_colors import QUADRANT_COLORS_MID
+from components import rrg_plot
+from components.rrg_plot import plot_rrg, plot_rrg_diff
+from components.rrg_table import assign_quadrant
+
+
+@pytest.fixture
+def rrg_long(random_panel):
+    """rrg_long(n_symbols, seed): valid long RRG rows and the latest points."""
+
+    def make(n_symbols=40, seed=4):
+        prices = random_panel(150, n_symbols, seed=seed)
+        tickers = [c for c in prices.columns if c != "SPY"]
+        panel = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0]
+        long = panel.to_long().dropna(subset=["RS_Ratio", "RS_Momentum"])
+        return long, get_latest_valid_points(panel)
+
+    return make
+
+
+def test_plot_rrg_batches_traces(rrg_long):
+    df, latest = rrg_long()
+    fig = plot_rrg(df, latest, max_points_per_ticker=4)
+    # At most one line trace per quadrant color, plus three marker traces
+    assert len(fig.data) <= 4 + 3
+    lines = [t for t in fig.data if t.mode == "lines"]
+    markers, previous, labelled = fig.data[len(lines) :]
+
+    n_symbols = df["Symbol"].nunique()
+    assert len(markers.x) == df.groupby("Symbol").tail(4).shape[0]
+    assert len(previous.x) == (df.groupby("Symbol").size() > 1).sum()
+    assert sorted(labelled.text) == sorted(df["Symbol"].unique())
+    # Each symbol's tail is its own polyline: one gap per symbol
+    assert sum(int(np.isnan(t.x).sum()) for t in lines) == n_symbols
+
+    for symbol, x, y, color in zip(
+        labelled.text, labelled.x, labelled.y, labelled.marker.color
+    ):
+        row = latest[latest["Symbol"] == symbol].iloc[0]
+        assert (x, y) == (row["RS_Ratio"], row["RS_Momentum"])
+        assert color == QUADRANT_COLORS_MID[assign_quadrant(x, y)]
+
+
+def test_plot_rrg_tail_points_match_per_symbol_tail(rrg_long):
+    df, latest = rrg_long(n_symbols=6, seed=2)
+    fig = plot_rrg(df, latest, max_points_per_ticker=5)
+    markers = [t for t in fig.data if t.mode == "markers"][0]
+    expected = df.sort_values(["Symbol", "Date"]).groupby("Symbol").tail(5)
+    np.testing.assert_allclose(markers.x, expected["RS_Ratio"])
+    np.testing.assert_allclose(markers.y, expected["RS_Momentum"])
+    opacity = np.asarray(markers.marker.opacity)
+    assert opacity.max() == 1.0 and (opacity == 1.0).sum() == latest.shape[0]
+
+
+def test_plot_rrg_switches_to_webgl_for_dense_tails(rrg_long):
+    df, latest = rrg_long(n_symbols=8, seed=3)
+    fig = plot_rrg(df, latest, gl_threshold=100, max_gl_tail_points=30)
+    lines = [t for t in fig.data if t.mode == "lines"]
+    markers = fig.data[len(lines)]
+    assert all(t.type == "scattergl" for t in lines + [markers])
+    assert all(t.line.shape is None for t in lines)
+
+    sizes = df.groupby("Symbol").size()
+    assert len(markers.x) == np.minimum(sizes, 30).sum()
+    # The latest points survive decimation
+    assert (np.asarray(markers.marker.opacity) == 1.0).sum() == latest.shape[0]
+
+    svg = plot_rrg(df, latest, gl_threshold=None)
+    assert all(t.type == "scatter" for t in svg.data)
+    # SVG tails keep Plotly's own splines, however long
+    assert all(t.line.shape == "spline" for t in svg.data if t.mode == "lines")
+
+
+def test_plot_rrg_ignores_warm_up_rows(random_panel):
+    prices = random_panel(150, 8, seed=3)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    panel = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0]
+    raw = panel.to_long()
+    assert raw["RS_Ratio"].isna().any()
+    latest = get_latest_valid_points(panel)
+    clean = raw.dropna(subset=["RS_Ratio", "RS_Momentum"])
+    for kwargs in (dict(gl_threshold=100, max_gl_tail_points=30), {}):
+        fig = plot_rrg(raw, latest, **kwargs)
+        expected = plot_rrg(clean, latest, **kwargs)
+        for got, want in zip(fig.data, expected.data):
+            np.testing.assert_array_equal(got.x, want.x)
+            np.testing.assert_array_equal(got.y, want.y)
+        lines = [t for t in fig.data if t.mode == "lines"]
+        markers = fig.data[len(lines)]
+        assert np.isfinite(markers.x).all() and np.isfinite(markers.y).all()
+        # Only the gaps between symbols are NaN in the smoothed lines
+        gaps = sum(int(np.isnan(t.x).sum()) for t in lines)
+        assert gaps == clean["Symbol"].nunique()
+
+
+def test_plot_rrg_webgl_respects_point_budgets(rrg_long, monkeypatch):
+    df, latest = rrg_long(n_symbols=8, seed=3)
+    monkeypatch.setattr(rrg_plot, "GL_POINT_BUDGET", 80)
+    monkeypatch.setattr(rrg_plot, "GL_LINE_POINT_BUDGET", 50)
+    fig = plot_rrg(df, latest, gl_threshold=100)
+    lines = [t for t in fig.data if t.mode == "lines"]
+    markers, previous, labelled = fig.data[len(lines) :]
+    assert len(markers.x) <= 80
+    # Dense figures fall back to plain polylines: no interpolated points
+    line_points = sum(int(np.isfinite(t.x).sum()) for t in lines)
+    assert line_points == len(markers.x)
+
+    # Marker colors are sent as quadrant codes
+    codes = np.asarray(markers.marker.color)
+    assert codes.dtype.kind in "iu" and markers.marker.cmin == -1
+    assert set(previous.marker.color) <= set(codes)
+
+
+def test_plot_rrg_diff_batches_dumbbells(random_panel):
+    prices = random_panel(200, 30, seed=6)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    ltf = get_rrg_panel(tickers, "SPY", "1mo", daily_prices=prices)[0].to_long()
+    htf = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0].to_long()
+    diff_df = compare_rrg_timeframes(ltf, htf)
+
+    fig = plot_rrg_diff(diff_df)
+    assert len(fig.data) == 3
+    connectors, ltf_markers, htf_markers = fig.data
+    n = len(diff_df)
+    assert len(connectors.x) == 3 * n and np.isnan(connectors.x[2::3]).all()
+    np.testing.assert_allclose(connectors.x[0::3], diff_df["RS_Ratio_LTF"])
+    np.testing.assert_allclose(connectors.y[1::3], diff_df["RS_Momentum_HTF"])
+    assert list(htf_markers.text) == list(diff_df["Symbol"])
+
+    moved = diff_df[diff_df["Speed"] > 0]
+    assert len(fig.layout.annotations) == len(moved)
+    for arrow, row in zip(fig.layout.annotations, moved.itertuples()):
+        assert (arrow.ax, arrow.ay) == (row.RS_Ratio_LTF, row.RS_Momentum_LTF)
+        assert (arrow.x, arrow.y) == (row.RS_Ratio_HTF, row.RS_Momentum_HTF)
+        quadrant = assign_quadrant(row.RS_Ratio_HTF, row.RS_Momentum_HTF)
+        assert arrow.arrowcolor == QUADRANT_COLORS_MID[quadrant]
+    assert fig.layout.template.layout.annotationdefaults.axref == "x"
+
+
+def test_plot_rrg_animation_frames_match_static_snapshots(rrg_long):
+    df, _ = rrg_long(n_symbols=8, seed=7)
+    fig = plot_rrg(df, None, max_points_per_ticker=4, animate=True, max_frames=20)
+    assert len(fig.frames) == 20
+    assert all(len(frame.data) == 7 for frame in fig.frames)
+    steps = fig.layout.sliders[0].steps
+    assert [s.args[0][0] for s in steps] == [f.name for f in fig.frames]
+    assert [b.label for b in fig.layout.updatemenus[0].buttons] == ["Play", "Pause"]
+
+    dates = np.sort(df["Date"].unique())
+    for frame, date in zip(fig.frames[::5], dates[-20::5]):
+        assert frame.name == str(date)[:10]
+        window = df[df["Date"].isin(dates[dates <= date][-4:])]
+        window_latest = window.sort_values("Date").groupby("Symbol").tail(1)
+        static = plot_rrg(window, window_latest, max_points_per_ticker=4).data
+        markers, previous, labelled = frame.data[4:]
+        np.testing.assert_allclose(markers.x, static[-3].x)
+        np.testing.assert_allclose(previous.y, static[-2].y)
+        assert list(labelled.text) == list(static[-1].text)
+        np.testing.assert_allclose(labelled.x, static[-1].x)
+    # The figure opens on the last frame
+    np.testing.assert_allclose(fig.data[4].x, fig.frames[-1].data[4].x)
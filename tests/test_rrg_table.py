@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from components.rrg_table import assign_quadrant, build_rrg_table
+
+
+def reference_table(category_dfs):
+    """The original iterrows construction, ranked with quadrant_order.index."""
+    rows = []
+    for df, _ in category_dfs:
+        for _, row in df.iterrows():
+            rows.append(
+                {
+                    "Symbol": row["Symbol"],
+                    "Quadrant": assign_quadrant(row["RS_Ratio"], row["RS_Momentum"]),
+                    "Distance": round(
+                        np.sqrt(
+                            (row["RS_Ratio"] - 100) ** 2
+                            + (row["RS_Momentum"] - 100) ** 2
+                        ),
+                        2,
+                    ),
+                    "MFC": row.get("Momentum_Flip_Count", None),
+                }
+            )
+    table = pd.DataFrame(rows)
+    order = ["Leading", "Improving", "Weakening", "Lagging"]
+    table["QuadrantRank"] = table["Quadrant"].apply(lambda q: order.index(q))
+    table = table.sort_values(
+        ["QuadrantRank", "Distance"], ascending=[True, False], kind="stable"
+    )
+    return table.drop(columns=["QuadrantRank"])
+
+
+def random_latest(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Symbol": [f"S{seed}_{i}" for i in range(n)],
+            "Date": pd.Timestamp("2024-06-28"),
+            "RS_Ratio": 100 + rng.normal(0, 2, n),
+            "RS_Momentum": 100 + rng.normal(0, 2, n),
+            "Momentum_Flip_Count": rng.integers(0, 5, n),
+        }
+    )
+
+
+def test_build_rrg_table_matches_row_loop():
+    category_dfs = [(random_latest(40, s), f"Group{s}") for s in range(5)]
+    category_dfs.insert(2, (pd.DataFrame(), "Empty"))
+    category_dfs[0][0].loc[3, "RS_Ratio"] = np.nan
+
+    styled, colors = build_rrg_table(category_dfs)
+    table = styled.data
+    expected = reference_table([c for c in category_dfs if not c[0].empty])
+    assert list(table.columns) == ["Symbol", "Quadrant", "Distance", "MFC"]
+    pd.testing.assert_frame_equal(
+        table.astype({"Quadrant": str}), expected, check_dtype=False
+    )
+    assert set(colors) == set(table["Quadrant"].cat.categories)
+
+
+def test_build_rrg_table_empty():
+    table, _ = build_rrg_table([(None, "A"), (pd.DataFrame(), "B")])
+    assert table.empty
+    assert list(table.columns) == ["Symbol", "Quadrant", "Distance", "MFC"]
+
+
+def test_classify_quadrants_matches_assign_quadrant():
+    from components.quadrant_colors import (
+        QUADRANT_COLORS_MID,
+        QUADRANT_ORDER,
+        quadrant_color_array,
+    )
+    from components.rrg_table import classify_quadrants
+
+    rng = np.random.default_rng(0)
+    values = np.concatenate([[99.0, 100.0, 101.0], 100 + rng.normal(0, 1, 200)])
+    rs_ratio, rs_momentum = np.meshgrid(values, values[::-1])
+    codes = classify_quadrants(rs_ratio, rs_momentum)
+    assert codes.dtype == np.int8 and codes.shape == rs_ratio.shape
+    expected = np.vectorize(assign_quadrant)(rs_ratio, rs_momentum)
+    assert (np.asarray(QUADRANT_ORDER)[codes] == expected).all()
+
+    codes = classify_quadrants([np.nan, 101.0], [101.0, np.nan])
+    assert list(codes) == [-1, -1]
+    colors = quadrant_color_array(
+        classify_quadrants([101.0, np.nan], [101.0, 99.0]), QUADRANT_COLORS_MID
+    )
+    assert list(colors) == [QUADRANT_COLORS_MID["Leading"], "#888888"]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.finance import get_rrg_panel
+from app.data.screener import latest_arrays, screen_rrg
+
+
+@pytest.fixture
+def panel(random_panel):
+    prices = random_panel(150, 60, seed=11)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    return get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0]
+
+
+def reference_screen(long, by, k):
+    """Full sort of the latest points, as build_rrg_table ranks them."""
+    valid = long.dropna(subset=["RS_Ratio", "RS_Momentum"])
+    valid = valid.sort_values(["Symbol", "Date"])
+    last = valid.groupby("Symbol").tail(1).set_index("Symbol")
+    prev = valid.groupby("Symbol").nth(-2).set_index("Symbol").reindex(last.index)
+    table = pd.DataFrame(
+        {
+            "Quadrant": np.select(
+                [
+                    (last["RS_Ratio"] >= 100) & (last["RS_Momentum"] >= 100),
+                    (last["RS_Ratio"] < 100) & (last["RS_Momentum"] >= 100),
+                    (last["RS_Ratio"] >= 100) & (last["RS_Momentum"] < 100),
+                ],
+                ["Leading", "Improving", "Weakening"],
+                default="Lagging",
+            ),
+            "Distance": np.hypot(last["RS_Ratio"] - 100, last["RS_Momentum"] - 100),
+            "Velocity": np.hypot(
+                last["RS_Ratio"] - prev["RS_Ratio"],
+                last["RS_Momentum"] - prev["RS_Momentum"],
+            ),
+        },
+        index=last.index,
+    )
+    table = table.dropna(subset=[by]).sort_values(by, ascending=False)
+    return table.groupby("Quadrant").head(k)
+
+
+@pytest.mark.parametrize("by", ["Distance", "Velocity"])
+def test_screen_matches_full_sort(panel, by):
+    k = 3
+    expected = reference_screen(panel.to_long(), by, k)
+    for data in (panel, panel.to_long()):
+        result = screen_rrg(data, by=by, k=k)
+        for quadrant, rows in result.groupby("Quadrant"):
+            ref = expected[expected["Quadrant"] == quadrant]
+            assert list(rows["Symbol"]) == list(ref.index)
+            np.testing.assert_allclose(rows[by], ref[by])
+            assert list(rows["Rank"]) == list(range(1, len(rows) + 1))
+
+
+def test_latest_arrays_agree(panel):
+    sym_a, latest_a, prev_a = latest_arrays(panel)
+    sym_b, latest_b, prev_b = latest_arrays(panel.to_long())
+    order = np.argsort(sym_a)
+    assert list(sym_a[order]) == list(sym_b)
+    np.testing.assert_allclose(latest_a[order], latest_b)
+    np.testing.assert_allclose(prev_a[order], prev_b)
+
+
+def test_screen_filters_and_heading(panel):
+    result = screen_rrg(
+        panel,
+        by="Heading",
+        k=5,
+        quadrants=["Improving", "Lagging"],
+        filters={"Distance": (0.5, None)},
+    )
+    assert set(result["Quadrant"]) <= {"Improving", "Lagging"}
+    assert (result["Distance"] >= 0.5).all()
+    for _, rows in result.groupby("Quadrant"):
+        off = np.abs((rows["Heading"] - 45 + 180) % 360 - 180)
+        assert off.is_monotonic_increasing
+
+    with pytest.raises(ValueError):
+        screen_rrg(panel, by="Price")
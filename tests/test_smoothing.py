@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from components import smoothing
+from components.smoothing import TailSmoother, catmull_rom, lttb_indices
+
+
+def reference_lttb(x, y, n_out):
+    """Textbook single-series LTTB."""
+    n = len(x)
+    if n <= n_out:
+        return list(range(n))
+    edges = 1 + np.floor(np.linspace(0, 1, n_out - 1) * (n - 2)).astype(int)
+    kept, a = [0], 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b < n_out - 3:
+            mx, my = x[hi : edges[b + 2]].mean(), y[hi : edges[b + 2]].mean()
+        else:
+            mx, my = x[-1], y[-1]
+        area = [
+            abs((x[a] - mx) * (y[i] - y[a]) - (x[a] - x[i]) * (my - y[a]))
+            for i in range(lo, hi)
+        ]
+        a = lo + int(np.argmax(area))
+        kept.append(a)
+    return kept + [n - 1]
+
+
+def groups(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    n = sum(lengths)
+    x = 100 + rng.normal(0, 1, n).cumsum() * 0.1
+    y = 100 + rng.normal(0, 1, n).cumsum() * 0.1
+    group_end = np.zeros(n, dtype=bool)
+    group_end[np.cumsum(lengths) - 1] = True
+    return x, y, group_end
+
+
+def test_lttb_matches_per_group_reference():
+    lengths = [300, 5, 41, 120]
+    x, y, group_end = groups(lengths)
+    keep = lttb_indices(x, y, group_end, 20)
+
+    start, expected = 0, []
+    for length in lengths:
+        part = slice(start, start + length)
+        expected += [start + i for i in reference_lttb(x[part], y[part], 20)]
+        start += length
+    assert list(keep) == expected
+    # Every group keeps its last point, so the group boundaries survive
+    assert group_end[keep].sum() == len(lengths)
+
+
+def test_catmull_rom_passes_through_points():
+    x, y, group_end = groups([6, 2, 9], seed=3)
+    out_x, out_y, out_end = catmull_rom(x, y, group_end, samples=4)
+    assert len(out_x) == 4 * (len(x) - 3) + 3
+    assert out_end.sum() == 3
+    # t = 0 of every segment and each group's last point are the original points
+    on_point = np.zeros(len(out_x), dtype=bool)
+    counts = np.where(group_end, 1, 4)
+    offsets = np.cumsum(counts) - counts
+    on_point[offsets] = True
+    np.testing.assert_allclose(out_x[on_point], x)
+    np.testing.assert_allclose(out_y[on_point], y)
+
+
+def test_tail_smoother_memoizes_per_key(monkeypatch):
+    x, y, group_end = groups([6, 3, 9], seed=5)
+    keys = [("A", 1, 6), ("B", 1, 3), ("C", 1, 9)]
+    smoother = TailSmoother(samples=4)
+    expected = catmull_rom(x, y, group_end, samples=4)
+    for got, want in zip(smoother.smooth(keys, x, y, group_end), expected):
+        np.testing.assert_array_equal(got, want)
+
+    calls = []
+    original = smoothing.catmull_rom
+
+    def counting(x, y, group_end, samples):
+        calls.append(int(group_end.sum()))
+        return original(x, y, group_end, samples)
+
+    monkeypatch.setattr(smoothing, "catmull_rom", counting)
+    # Same keys: nothing is recomputed; one new tail: only it is interpolated
+    smoother.smooth(keys, x, y, group_end)
+    assert calls == []
+    got = smoother.smooth(keys[:2] + [("C", 2, 9)], x, y, group_end)
+    assert calls == [1]
+    np.testing.assert_array_equal(got[0], expected[0])
+
+    # Bounded by stored points (A and B: 21 + 9), evicting the least recently used
+    smoother.clear()
+    smoother.max_points = 30
+    smoother.smooth(keys[:2], x[:9], y[:9], group_end[:9])
+    smoother.smooth(keys[:1], x[:6], y[:6], group_end[:6])
+    smoother.smooth([("D", 1, 3)], x[6:9], y[6:9], group_end[6:9])
+    assert len(smoother) == 2 and smoother.points == 30
+    calls.clear()
+    smoother.smooth(keys[:1], x[:6], y[:6], group_end[:6])
+    assert calls == []
+    smoother.smooth(keys[1:2], x[6:9], y[6:9], group_end[6:9])
+    assert calls == [1]
+
+
+def test_tail_smoother_is_thread_safe():
+    x, y, group_end = groups([5] * 40, seed=6)
+    expected = catmull_rom(x, y, group_end, samples=4)
+    # A tiny budget keeps evicting while other threads look curves up
+    smoother = TailSmoother(samples=4, max_points=100)
+    keys = [(f"S{i}", 1, 5) for i in range(40)]
+
+    def run(offset):
+        for step in range(30):
+            order = np.roll(np.arange(40), offset + step)
+            rows = (order[:, None] * 5 + np.arange(5)).ravel()
+            got = smoother.smooth(
+                [keys[i] for i in order], x[rows], y[rows], group_end[rows]
+            )
+            want = (order[:, None] * 17 + np.arange(17)).ravel()
+            np.testing.assert_array_equal(got[0], expected[0][want])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(run, range(8)))
+    assert smoother.points <= 100
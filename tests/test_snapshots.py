@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.finance import get_rrg_panel
+from app.data.snapshots import SnapshotCube
+
+
+@pytest.fixture
+def panel_and_cube(random_panel):
+    prices = random_panel(120, 5, seed=3)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    panel = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0]
+    return panel, SnapshotCube.from_panel(panel)
+
+
+def test_tail_matches_date_filter(panel_and_cube):
+    panel, cube = panel_and_cube
+    long = panel.to_long()
+    end_date = cube.dates[80]
+    start_date = cube.dates[80 - 5]
+
+    tail = cube.tail_frame(cube.position(end_date), 5)
+    expected = long[(long["Date"] > start_date) & (long["Date"] <= end_date)]
+    expected = expected.dropna(subset=["RS_Ratio", "RS_Momentum"])
+    pd.testing.assert_frame_equal(
+        tail.sort_values(["Symbol", "Date"]).reset_index(drop=True),
+        expected[tail.columns].reset_index(drop=True),
+    )
+
+    latest = cube.latest_frame(cube.position(end_date), 5)
+    pd.testing.assert_frame_equal(
+        latest.sort_values("Symbol").reset_index(drop=True),
+        expected.groupby("Symbol").tail(1)[latest.columns].reset_index(drop=True),
+    )
+
+
+def test_tails_are_views(panel_and_cube):
+    _, cube = panel_and_cube
+    tails = cube.tails(4)
+    assert tails.shape == (len(cube) - 3, 4, len(cube.symbols), 2)
+    assert np.shares_memory(tails, cube.coords)
+    np.testing.assert_array_equal(tails[10], cube.tail(13, 4))
+    assert np.shares_memory(cube.tail(13, 4), cube.coords)
+
+
+def test_position_between_bars(panel_and_cube):
+    _, cube = panel_and_cube
+    assert cube.position(cube.dates[0] - pd.Timedelta(days=1)) == -1
+    assert cube.position(cube.dates[7]) == 7
+    assert cube.position(cube.dates[7] + pd.Timedelta(hours=1)) == 7
+    assert cube.position(cube.dates[-1] + pd.Timedelta(days=30)) == len(cube) - 1
+
+    # Before every bar: empty tails, not a wrap-around to the last bars
+    assert cube.tail(-1, 5).shape == (0, len(cube.symbols), 2)
+    assert cube.tail_frame(-1, 5).empty and cube.latest_frame(-1, 5).empty
+    assert list(cube.tail_frame(-1, 5).columns) == list(cube.tail_frame(7, 5).columns)
+
+
+def test_from_long_matches_from_panel(panel_and_cube):
+    panel, cube = panel_and_cube
+    rebuilt = SnapshotCube.from_long(panel.to_long())
+    order = cube.symbols.get_indexer(rebuilt.symbols)
+    np.testing.assert_array_equal(
+        rebuilt.coords, cube.coords[:, order][cube.dates.isin(rebuilt.dates)]
+    )
+
+
+def test_valid_dates_skip_warm_up_bars():
+    coords = np.full((4, 2, 2), np.nan)
+    coords[2, 1] = [101.0, 99.0]
+    coords[3] = 100.0
+    dates = pd.date_range("2024-01-01", periods=4, name="Date")
+    cube = SnapshotCube(dates, ["A", "B"], coords)
+    assert list(cube.valid_dates()) == list(dates[2:])
@@ -0,0 +1,25 @@
+import numpy as np
+
+from app.data.finance import calculate_rs_ratio_and_momentum
+from app.data.streaming import RRGState
+
+
+def test_streaming_updates_match_batch_engine(random_panel):
+    prices = random_panel(n_dates=300, n_symbols=6, seed=4)
+    window = 20
+    state = RRGState.from_prices(prices.iloc[:250], "SPY", window)
+    for date, row in prices.iloc[250:].iterrows():
+        latest = state.update(row.to_dict(), date)
+
+    batch = calculate_rs_ratio_and_momentum(
+        prices.drop(columns="SPY"), prices["SPY"], window
+    )
+    expected = batch.groupby("Symbol").last()
+    # groupby.last skips NaN; a symbol with no prices has nothing to compare
+    for symbol in ["S0", "S1", "S2", "S4", "S5"]:
+        np.testing.assert_allclose(
+            latest.loc[symbol, ["RS_Ratio", "RS_Momentum"]].to_numpy(dtype=float),
+            expected.loc[symbol, ["RS_Ratio", "RS_Momentum"]].to_numpy(dtype=float),
+            rtol=1e-8,
+        )
+    assert np.isnan(latest.loc["S3", "RS_Ratio"])
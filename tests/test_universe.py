@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.data.providers import SyntheticProvider
+from app.data.universe import PriceUniverse
+
+
+class CountingProvider(SyntheticProvider):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        self.requests.append(list(symbols))
+        return super().download(symbols, interval, period, start, auto_adjust)
+
+
+def test_universe_fetches_deduplicated_union_once():
+    provider = CountingProvider(end="2024-06-28")
+    groups = {"A": ["MOS", "PM", "BJ"], "B": ["PM", "COST", "MOS"]}
+    universe = PriceUniverse(groups, benchmarks=["SPY"], periods=["1y"], provider=provider)
+    universe.load()
+    assert provider.requests == [["MOS", "PM", "BJ", "COST", "SPY"]]
+
+    group = universe.group("B", "SPY")
+    assert list(group.columns) == ["PM", "COST", "MOS", "SPY"]
+    np.testing.assert_array_equal(group["PM"], universe.panel["PM"])
+
+    universe.ensure(["SPY", "QQQ"])
+    assert provider.requests[-1] == ["QQQ"]
+    assert "QQQ" in universe.group("A", "QQQ").columns
+
+
+class SlowProvider(CountingProvider):
+    def download(self, symbols, interval, period=None, start=None, auto_adjust=True):
+        # Long enough for concurrent sessions to overlap
+        time.sleep(0.05)
+        return super().download(symbols, interval, period, start, auto_adjust)
+
+
+def test_concurrent_ensure_keeps_every_benchmark():
+    provider = SlowProvider(end="2024-06-28")
+    universe = PriceUniverse({"A": ["MOS", "PM"]}, periods=["1y"], provider=provider)
+    universe.load()
+    benchmarks = ["SPY", "QQQ", "IWM", "DIA", "SPY", "QQQ"]
+    with ThreadPoolExecutor(max_workers=len(benchmarks)) as pool:
+        list(pool.map(lambda b: universe.ensure([b]), benchmarks))
+    assert set(universe.panel.columns) == {"MOS", "PM", "SPY", "QQQ", "IWM", "DIA"}
+    # Each benchmark is downloaded once, however many sessions asked for it
+    fetched = [s for request in provider.requests[1:] for s in request]
+    assert sorted(fetched) == ["DIA", "IWM", "QQQ", "SPY"]
+    assert universe.failed == []
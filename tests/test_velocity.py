@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from app.data.finance import get_rrg_panel
+from app.data.velocity import compare_rrg_timeframes, rrg_velocity_table
+
+
+def reference_compare(df1, df2, columns=("RS_Ratio", "RS_Momentum")):
+    """The original per-symbol loop, without the zero-length guard."""
+
+    def get_latest(df):
+        valid = df.dropna(subset=["RS_Ratio", "RS_Momentum"])
+        idx = valid.groupby("Symbol")["Date"].idxmax()
+        return valid.loc[idx].set_index("Symbol")
+
+    latest1, latest2 = get_latest(df1), get_latest(df2)
+    common = latest1.index.intersection(latest2.index)
+    rows = []
+    for symbol in common:
+        row = {"Symbol": symbol}
+        for col in columns:
+            row[f"{col}_Diff"] = latest2.loc[symbol, col] - latest1.loc[symbol, col]
+            row[f"{col}_HTF"] = latest2.loc[symbol, col]
+            row[f"{col}_LTF"] = latest1.loc[symbol, col]
+        magnitude = np.sqrt(row["RS_Ratio_Diff"] ** 2 + row["RS_Momentum_Diff"] ** 2)
+        row["Perp_RS_Ratio"] = -row["RS_Momentum_Diff"] / magnitude
+        row["Perp_RS_Momentum"] = row["RS_Ratio_Diff"] / magnitude
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def long_frame(symbols, ratio, momentum):
+    return pd.DataFrame(
+        {
+            "Symbol": symbols,
+            "Date": pd.Timestamp("2024-01-31"),
+            "RS_Ratio": ratio,
+            "RS_Momentum": momentum,
+        }
+    )
+
+
+def test_matches_reference_loop(random_panel):
+    prices = random_panel(200, 12, seed=5)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    ltf = get_rrg_panel(tickers, "SPY", "1mo", daily_prices=prices)[0].to_long()
+    htf = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0].to_long()
+
+    result = compare_rrg_timeframes(ltf, htf)
+    expected = reference_compare(ltf, htf)
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+    np.testing.assert_allclose(
+        result["Speed"], np.hypot(result["RS_Ratio_Diff"], result["RS_Momentum_Diff"])
+    )
+
+
+def test_heading_rotation_and_zero_move():
+    ltf = long_frame(["A", "B", "C"], [101.0, 101.0, 99.0], [100.0, 100.0, 99.0])
+    # A turns a quarter clockwise around (100, 100), B counter-clockwise, C stays put
+    htf = long_frame(["A", "B", "C"], [100.0, 100.0, 99.0], [99.0, 101.0, 99.0])
+
+    result = compare_rrg_timeframes(ltf, htf).set_index("Symbol")
+    np.testing.assert_allclose(result.loc[["A", "B"], "Angular_Rate"], [-90, 90])
+    np.testing.assert_allclose(result.loc[["A", "B"], "Heading"], [225, 135])
+    assert result.loc["C", "Speed"] == 0
+    assert np.isnan(result.loc["C", "Heading"])
+    assert result.loc["C", ["Perp_RS_Ratio", "Perp_RS_Momentum"]].eq(0).all()
+    assert (result.dtypes == float).all()
+
+
+def test_speed_in_noise_units(random_panel):
+    prices = random_panel(200, 6, seed=9)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    ltf = get_rrg_panel(tickers, "SPY", "1mo", daily_prices=prices)[0].to_long()
+    htf = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0].to_long()
+
+    result = compare_rrg_timeframes(ltf, htf).set_index("Symbol")
+    valid = htf.dropna(subset=["RS_Ratio", "RS_Momentum"])
+    latest = valid.groupby("Symbol").tail(1).set_index("Symbol")
+    noise = np.hypot(latest["RS_Ratio_Vol"], latest["RS_Momentum_Vol"])
+    np.testing.assert_allclose(
+        result["Speed_Norm"], result["Speed"] / noise[result.index]
+    )
+    assert "Speed_Norm" not in compare_rrg_timeframes(
+        ltf[ltf.columns[:7]], htf[htf.columns[:7]]
+    )
+
+
+def reference_color_log_diff(val):
+    """The original per-cell RdBu_11 style."""
+    from palettable.colorbrewer.diverging import RdBu_11
+
+    val = max(-1, min(1, val))
+    idx = int((val + 1) / 2 * (len(RdBu_11.mpl_colors) - 1))
+    rgb = RdBu_11.mpl_colors[idx]
+    hex_color = "#%02x%02x%02x" % tuple(int(255 * c) for c in rgb)
+    brightness = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
+    text_color = "black" if brightness > 0.6 else "white"
+    return f"background-color: {hex_color}; color: {text_color};"
+
+
+def test_velocity_table_sort_styles_and_pages(random_panel):
+    from components.quadrant_colors import QUADRANT_COLORS
+    from components.rrg_table import assign_quadrant
+
+    prices = random_panel(200, 12, seed=5)
+    tickers = [c for c in prices.columns if c != "SPY"]
+    ltf = get_rrg_panel(tickers, "SPY", "1mo", daily_prices=prices)[0].to_long()
+    htf = get_rrg_panel(tickers, "SPY", "6mo", daily_prices=prices)[0].to_long()
+    diff_df = compare_rrg_timeframes(ltf, htf)
+
+    styled = rrg_velocity_table(diff_df)
+    table = styled.data
+    expected = diff_df.round(2).sort_values(
+        ["RS_Momentum_Diff", "RS_Ratio_HTF"], ascending=[True, False]
+    )
+    assert list(table["Symbol"]) == list(expected["Symbol"])
+    assert list(table.columns[:4]) == [
+        "Symbol",
+        "Distance_HTF",
+        "Distance_LTF",
+        "Distance_LogPct_Diff",
+    ]
+
+    ctx = styled._compute().ctx
+    col = table.columns.get_loc
+    for i, row in enumerate(expected.itertuples()):
+        quadrant = assign_quadrant(row.RS_Ratio_HTF, row.RS_Momentum_HTF)
+        assert ctx[(i, col("Distance_HTF"))][0] == (
+            "background-color",
+            QUADRANT_COLORS[quadrant],
+        )
+        style = reference_color_log_diff(table["Perp_RS_Ratio"].iloc[i])
+        got = "; ".join(f"{k}: {v}" for k, v in ctx[(i, col("Perp_RS_Ratio"))])
+        assert got + ";" == style
+    assert (i, col("Symbol")) not in ctx
+
+    page = rrg_velocity_table(diff_df, page_size=4, page=1).data
+    pd.testing.assert_frame_equal(page, table.iloc[4:8].reset_index(drop=True))